@@ -1,6 +1,15 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional, Dict, Any, Union, TypedDict
 from datetime import datetime
+from Utils.search_window import SEARCH_WINDOW_MAX_DAYS
 class ChatRequest(BaseModel):
     thread_id: str = Field(..., description="Unique identifier for the conversation thread")
-    user_msg: str = Field(..., description="The user's message")
\ No newline at end of file
+    user_msg: str = Field(..., description="The user's message")
+    flex_days: Optional[int] = Field(None, ge=0, description="Search ±N days around the departure date (defaults to the server's configured window)")
+
+    @field_validator("flex_days")
+    @classmethod
+    def check_flex_days(cls, value: Optional[int]) -> Optional[int]:
+        if value is not None and value > SEARCH_WINDOW_MAX_DAYS:
+            raise ValueError(f"flex_days must be at most {SEARCH_WINDOW_MAX_DAYS}")
+        return value
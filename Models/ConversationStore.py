@@ -1,45 +1,392 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any, Union, TypedDict
+from typing import List, Optional, Dict, Any, Union, TypedDict, Callable, Tuple
+from collections import OrderedDict
 from datetime import datetime
+import asyncio
+import heapq
+import os
+import sqlite3
+import threading
+import time
 
-class ConversationStore:
-    def __init__(self):
-        self._conversations: Dict[str, List[Dict[str, Any]]] = {}
+SYSTEM_PROMPT = (
+    "You are a helpful AI travel assistant specializing in flight bookings. "
+    "Your goal is to help users find the best flights by gathering their preferences "
+    "in a natural, conversational way. You can understand flexible date formats, "
+    "casual location names, and abbreviated terms. Always be friendly and efficient."
+)
+
+
+# Rough per-object overhead used for live byte accounting of the in-memory store
+_MESSAGE_OVERHEAD_BYTES = 120
+_THREAD_OVERHEAD_BYTES = 400
+# How long a SQLite write waits for another worker's write lock before failing (seconds)
+_BUSY_TIMEOUT_SECONDS = 2.0
+
+
+class _AsyncStoreMixin:
+    """
+    Awaitable versions of the store methods for the async endpoints.
+    Stores that block on I/O set _offload so the calls run in a worker thread instead of the event loop.
+    """
+
+    _offload = False
+
+    async def _call(self, fn, *args, **kwargs):
+        if self._offload:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+        return fn(*args, **kwargs)
+
+    async def aget_conversation(self, thread_id: str) -> List[Dict[str, Any]]:
+        return await self._call(self.get_conversation, thread_id)
+
+    async def aadd_message(self, thread_id: str, role: str, content: str) -> None:
+        await self._call(self.add_message, thread_id, role, content)
+
+    async def aclear_conversation(self, thread_id: str) -> None:
+        await self._call(self.clear_conversation, thread_id)
+
+    async def alist_threads(self, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[str], Optional[str]]:
+        return await self._call(self.list_threads, cursor=cursor, limit=limit)
+
+    async def aget_stats(self) -> Dict[str, Any]:
+        return await self._call(self.get_stats)
+
+
+class ConversationStore(_AsyncStoreMixin):
+    """
+    In-memory conversation store bounded by a memory budget.
+    Threads are evicted least-recently-used once the budget is exceeded, and each thread keeps
+    at most max_messages messages. Trimmed or evicted messages go to archive_hook if one is set,
+    and evict_hook is told the thread ID of every evicted thread.
+    """
+
+    def __init__(
+        self,
+        memory_budget_bytes: int = 64 * 1024 * 1024,
+        max_messages: int = 50,
+        archive_hook: Optional[Callable[[str, List[Dict[str, Any]]], None]] = None,
+        evict_hook: Optional[Callable[[str], None]] = None,
+    ):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.max_messages = max_messages
+        self.archive_hook = archive_hook
+        self.evict_hook = evict_hook
+        # thread_id -> (created_at, [(role, content, timestamp), ...]); least recently used first
+        self._conversations: "OrderedDict[str, Tuple[float, List[Tuple[str, str, float]]]]" = OrderedDict()
+        self._thread_bytes: Dict[str, int] = {}
+        self._bytes = 0
+        self._stats = {"evicted_threads": 0, "trimmed_messages": 0}
+
+    @staticmethod
+    def _message_bytes(role: str, content: str) -> int:
+        return len(role) + len(content.encode("utf-8")) + _MESSAGE_OVERHEAD_BYTES
+
+    @staticmethod
+    def _to_dict(role: str, content: str, timestamp: float) -> Dict[str, Any]:
+        return {"role": role, "content": content, "timestamp": datetime.fromtimestamp(timestamp).isoformat()}
     
     def get_conversation(self, thread_id: str) -> List[Dict[str, Any]]:
         """Get conversation history for a thread"""
-        return self._conversations.get(thread_id, [])
+        entry = self._conversations.get(thread_id)
+        if entry is None:
+            return []
+        self._conversations.move_to_end(thread_id)
+        created_at, messages = entry
+        # The system prompt is shared, not stored per thread
+        return [self._to_dict("system", SYSTEM_PROMPT, created_at)] + [self._to_dict(*m) for m in messages]
     
     def add_message(self, thread_id: str, role: str, content: str) -> None:
         """Add a message to conversation history"""
+        now = time.time()
         if thread_id not in self._conversations:
-            self._conversations[thread_id] = [
-                {
-                    "role": "system", 
-                    "content": (
-                        "You are a helpful AI travel assistant specializing in flight bookings. "
-                        "Your goal is to help users find the best flights by gathering their preferences "
-                        "in a natural, conversational way. You can understand flexible date formats, "
-                        "casual location names, and abbreviated terms. Always be friendly and efficient."
-                    ),
-                    "timestamp": datetime.now().isoformat()
-                }
-            ]
-        
-        self._conversations[thread_id].append({
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat()
-        })
+            self._conversations[thread_id] = (now, [])
+            self._thread_bytes[thread_id] = _THREAD_OVERHEAD_BYTES
+            self._bytes += _THREAD_OVERHEAD_BYTES
+        self._conversations.move_to_end(thread_id)
+
+        messages = self._conversations[thread_id][1]
+        messages.append((role, content, now))
+        self._account(thread_id, self._message_bytes(role, content))
+
+        if len(messages) > self.max_messages:
+            trimmed = messages[:len(messages) - self.max_messages]
+            del messages[:len(trimmed)]
+            self._account(thread_id, -sum(self._message_bytes(r, c) for r, c, _ in trimmed))
+            self._stats["trimmed_messages"] += len(trimmed)
+            self._archive(thread_id, trimmed)
+
+        self._enforce_budget(keep=thread_id)
+
+    def _account(self, thread_id: str, delta: int) -> None:
+        self._thread_bytes[thread_id] += delta
+        self._bytes += delta
+
+    def _archive(self, thread_id: str, messages: List[Tuple[str, str, float]]) -> None:
+        if self.archive_hook is None or not messages:
+            return
+        try:
+            self.archive_hook(thread_id, [self._to_dict(*m) for m in messages])
+        except Exception as e:
+            print(f"ConversationStore: archive hook failed for {thread_id}: {e}")
+
+    def _enforce_budget(self, keep: str) -> None:
+        while self._bytes > self.memory_budget_bytes and len(self._conversations) > 1:
+            oldest = next(iter(self._conversations))
+            if oldest == keep:
+                break
+            _, messages = self._conversations[oldest]
+            self._archive(oldest, messages)
+            self._remove(oldest)
+            self._stats["evicted_threads"] += 1
+            _notify_evicted(self.evict_hook, [oldest])
+
+    def _remove(self, thread_id: str) -> None:
+        del self._conversations[thread_id]
+        self._bytes -= self._thread_bytes.pop(thread_id)
     
     def clear_conversation(self, thread_id: str) -> None:
         """Clear conversation history for a thread"""
         if thread_id in self._conversations:
-            del self._conversations[thread_id]
+            self._remove(thread_id)
     
     def get_all_threads(self) -> List[str]:
         """Get all active thread IDs"""
         return list(self._conversations.keys())
 
+    def list_threads(self, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[str], Optional[str]]:
+        """Page through thread IDs in stable (sorted) order; returns (page, next_cursor)."""
+        # Select just this page (plus one to detect a next page) instead of sorting every thread;
+        # LRU order can't be used as it changes on every read
+        after = (t for t in self._conversations if t > cursor) if cursor else iter(self._conversations)
+        rows = heapq.nsmallest(limit + 1, after)
+        page = rows[:limit]
+        next_cursor = page[-1] if page and len(rows) > limit else None
+        return page, next_cursor
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Live size accounting for /health"""
+        return {
+            "backend": "memory",
+            "threads": len(self._conversations),
+            "messages": sum(len(m) for _, m in self._conversations.values()),
+            "bytes": self._bytes,
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "max_messages_per_thread": self.max_messages,
+            **self._stats,
+        }
+
+
+class SqliteConversationStore(_AsyncStoreMixin):
+    """
+    Conversation store backed by a WAL-mode SQLite file, shareable by several worker processes.
+    Threads idle for longer than ttl_seconds expire; recent reads are served from a bounded
+    in-process cache that is validated against the thread's version on every read.
+    evict_hook is told the thread ID of every thread that expires.
+    The async methods run in a worker thread, since a write can wait on another worker's lock.
+    """
+
+    _offload = True
+
+    def __init__(self, path: str, ttl_seconds: float = 24 * 3600, cache_size: int = 256,
+                 evict_hook: Optional[Callable[[str], None]] = None):
+        self.ttl_seconds = ttl_seconds
+        self.cache_size = cache_size
+        self.evict_hook = evict_hook
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()  # thread_id -> (version, messages)
+        self._lock = threading.Lock()
+        self._writes_since_purge = 0
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=_BUSY_TIMEOUT_SECONDS)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS threads (
+                thread_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_threads_updated_at ON threads (updated_at);
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                thread_id TEXT NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                timestamp TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_messages_thread ON messages (thread_id, id);
+            """
+        )
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl_seconds
+
+    def get_conversation(self, thread_id: str) -> List[Dict[str, Any]]:
+        """Get conversation history for a thread"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT version, updated_at FROM threads WHERE thread_id = ?", (thread_id,)
+            ).fetchone()
+            if row is None:
+                self._cache.pop(thread_id, None)
+                return []
+            version, updated_at = row
+            if updated_at < self._cutoff():
+                self._delete_thread(thread_id)
+                _notify_evicted(self.evict_hook, [thread_id])
+                return []
+
+            cached = self._cache.get(thread_id)
+            if cached is not None and cached[0] == version:
+                self._cache.move_to_end(thread_id)
+                return list(cached[1])
+
+            messages = [
+                {"role": role, "content": content, "timestamp": timestamp}
+                for role, content, timestamp in self._db.execute(
+                    "SELECT role, content, timestamp FROM messages WHERE thread_id = ? ORDER BY id",
+                    (thread_id,),
+                )
+            ]
+            self._cache[thread_id] = (version, messages)
+            self._cache.move_to_end(thread_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return list(messages)
+
+    def add_message(self, thread_id: str, role: str, content: str) -> None:
+        """Add a message to conversation history"""
+        now = datetime.now().isoformat()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front so concurrent workers serialize cleanly
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT updated_at FROM threads WHERE thread_id = ?", (thread_id,)
+                ).fetchone()
+                if row is not None and row[0] < self._cutoff():
+                    self._db.execute("DELETE FROM messages WHERE thread_id = ?", (thread_id,))
+                    self._db.execute("DELETE FROM threads WHERE thread_id = ?", (thread_id,))
+                    row = None
+                if row is None:
+                    self._db.execute(
+                        "INSERT INTO threads (thread_id, version, updated_at) VALUES (?, 0, ?)",
+                        (thread_id, time.time()),
+                    )
+                    self._db.execute(
+                        "INSERT INTO messages (thread_id, role, content, timestamp) VALUES (?, 'system', ?, ?)",
+                        (thread_id, SYSTEM_PROMPT, now),
+                    )
+                self._db.execute(
+                    "INSERT INTO messages (thread_id, role, content, timestamp) VALUES (?, ?, ?, ?)",
+                    (thread_id, role, content, now),
+                )
+                self._db.execute(
+                    "UPDATE threads SET version = version + 1, updated_at = ? WHERE thread_id = ?",
+                    (time.time(), thread_id),
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self._cache.pop(thread_id, None)
+
+            self._writes_since_purge += 1
+            if self._writes_since_purge >= 100:
+                self._purge_expired()
+
+    def clear_conversation(self, thread_id: str) -> None:
+        """Clear conversation history for a thread"""
+        with self._lock:
+            self._delete_thread(thread_id)
+
+    def get_all_threads(self) -> List[str]:
+        """Get all active thread IDs"""
+        with self._lock:
+            return [
+                thread_id for (thread_id,) in self._db.execute(
+                    "SELECT thread_id FROM threads WHERE updated_at >= ? ORDER BY updated_at",
+                    (self._cutoff(),),
+                )
+            ]
+
+    def list_threads(self, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[str], Optional[str]]:
+        """Page through active thread IDs in stable (sorted) order; returns (page, next_cursor)."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT thread_id FROM threads WHERE thread_id > ? AND updated_at >= ? "
+                "ORDER BY thread_id LIMIT ?",
+                (cursor or "", self._cutoff(), limit + 1),
+            ).fetchall()
+        page = [thread_id for (thread_id,) in rows[:limit]]
+        next_cursor = page[-1] if len(rows) > limit else None
+        return page, next_cursor
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Live size accounting for /health"""
+        with self._lock:
+            threads, = self._db.execute("SELECT COUNT(*) FROM threads").fetchone()
+            messages, = self._db.execute("SELECT COUNT(*) FROM messages").fetchone()
+            page_count, = self._db.execute("PRAGMA page_count").fetchone()
+            page_size, = self._db.execute("PRAGMA page_size").fetchone()
+        return {
+            "backend": "sqlite",
+            "threads": threads,
+            "messages": messages,
+            "bytes": page_count * page_size,
+            "cached_threads": len(self._cache),
+        }
+
+    def _delete_thread(self, thread_id: str) -> None:
+        self._db.execute("BEGIN IMMEDIATE")
+        self._db.execute("DELETE FROM messages WHERE thread_id = ?", (thread_id,))
+        self._db.execute("DELETE FROM threads WHERE thread_id = ?", (thread_id,))
+        self._db.execute("COMMIT")
+        self._cache.pop(thread_id, None)
+
+    def _purge_expired(self) -> None:
+        self._writes_since_purge = 0
+        cutoff = self._cutoff()
+        self._db.execute("BEGIN IMMEDIATE")
+        expired = [
+            thread_id for (thread_id,) in self._db.execute(
+                "SELECT thread_id FROM threads WHERE updated_at < ?", (cutoff,)
+            )
+        ]
+        self._db.execute(
+            "DELETE FROM messages WHERE thread_id IN (SELECT thread_id FROM threads WHERE updated_at < ?)",
+            (cutoff,),
+        )
+        self._db.execute("DELETE FROM threads WHERE updated_at < ?", (cutoff,))
+        self._db.execute("COMMIT")
+        for thread_id in expired:
+            self._cache.pop(thread_id, None)
+        _notify_evicted(self.evict_hook, expired)
+
+
+def _notify_evicted(evict_hook: Optional[Callable[[str], None]], thread_ids: List[str]) -> None:
+    if evict_hook is None:
+        return
+    for thread_id in thread_ids:
+        try:
+            evict_hook(thread_id)
+        except Exception as e:
+            print(f"ConversationStore: evict hook failed for {thread_id}: {e}")
+
+
+def create_conversation_store():
+    """Build the conversation store selected by CONVERSATION_STORE_BACKEND (memory or sqlite)."""
+    backend = os.getenv("CONVERSATION_STORE_BACKEND", "memory").lower()
+    if backend == "sqlite":
+        return SqliteConversationStore(
+            path=os.getenv("CONVERSATION_STORE_PATH", "conversations.sqlite3"),
+            ttl_seconds=float(os.getenv("CONVERSATION_TTL_SECONDS", str(24 * 3600))),
+            cache_size=int(os.getenv("CONVERSATION_CACHE_SIZE", "256")),
+        )
+    return ConversationStore(
+        memory_budget_bytes=int(os.getenv("CONVERSATION_MEMORY_BUDGET_BYTES", str(64 * 1024 * 1024))),
+        max_messages=int(os.getenv("CONVERSATION_MAX_MESSAGES", "50")),
+    )
+
 # Global conversation store instance
-conversation_store = ConversationStore()
\ No newline at end of file
+conversation_store = create_conversation_store()
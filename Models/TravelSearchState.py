@@ -1,4 +1,11 @@
-from typing import List, Optional, Dict, Any, TypedDict
+from typing import Annotated, List, Optional, Dict, Any, TypedDict
+
+
+def last_value(current: Any, update: Any) -> Any:
+	"""Reducer for keys that parallel branches may both write: the last write wins."""
+	return update
+
+
 class TravelSearchState(TypedDict, total=False):
 	# Thread / conversation
 	thread_id: str
@@ -7,13 +14,18 @@ class TravelSearchState(TypedDict, total=False):
 	user_message: str
 
 	# Control/flow state
-	current_node: Optional[str]
+	current_node: Annotated[Optional[str], last_value]
 	node_trace: List[str]
 	needs_followup: bool
 	info_complete: bool
-	followup_question: Optional[str]
+	followup_question: Annotated[Optional[str], last_value]
 	request_type: Optional[str]  # flights / hotels / packages
 
+	# Extraction prompt windowing
+	history_summary: Optional[str]
+	history_summary_key: Optional[List[Any]]
+	prompt_tokens: Optional[int]
+
 	# -------------------------
 	# Flight search
 	# -------------------------
@@ -33,10 +45,12 @@ class TravelSearchState(TypedDict, total=False):
 	normalized_cabin: Optional[str]
 	normalized_trip_type: Optional[str]
 
-	# Flight results
-	flight_offers_day_1: Optional[List[Dict[str, Any]]]
-	flight_offers_day_2: Optional[List[Dict[str, Any]]]
-	flight_offers_day_3: Optional[List[Dict[str, Any]]]
+	# Flexible-date window: ±flex_days around the departure date (None = configured default)
+	flex_days: Optional[int]
+	search_dates: Optional[List[str]]
+
+	# Flight results, keyed by searched departure date
+	flight_offers_by_date: Optional[Dict[str, List[Dict[str, Any]]]]
 	formatted_results: Optional[List[Dict[str, Any]]]
 
 	# -------------------------
@@ -45,16 +59,14 @@ class TravelSearchState(TypedDict, total=False):
 	hotel_ids: Optional[List[str]]
 	hotel_id: Optional[List[str]]  # some nodes use hotel_id
 	city_code: Optional[str]
-	checkin_date: Optional[List[str]]   # from departure_date
-	checkout_date: Optional[List[str]]  # from departure_date + duration
+	stay_windows: Optional[Dict[str, Dict[str, str]]]  # departure date -> {"checkin", "checkout"} from its flight
 	currency: Optional[str]
 	room_quantity: Optional[int]
 	adult: Optional[int]
 
 	# Hotel results
-	hotel_offers_duration_1: Optional[List[Dict[str, Any]]]
-	hotel_offers_duration_2: Optional[List[Dict[str, Any]]]
-	hotel_offers_duration_3: Optional[List[Dict[str, Any]]]
+	hotel_offers_by_date: Optional[Dict[str, List[Dict[str, Any]]]]  # top HOTEL_TOP_K per date, cheapest first
+	hotel_counts_by_date: Optional[Dict[str, Dict[str, int]]]  # date -> {"found", "available"} before the top-k cut
 	hotel_offers: Optional[List[Dict[str, Any]]]
 	travel_packages: List[Dict]
 
@@ -62,7 +74,6 @@ class TravelSearchState(TypedDict, total=False):
 	# Shared API fields
 	# -------------------------
 	body: Optional[Dict[str, Any]]
-	access_token: Optional[str]
 	package_summary: Optional[str]
 	travel_packages_html: Optional[List[str]]
 	selected_offer: Optional[Dict[str, Any]]
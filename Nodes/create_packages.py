@@ -1,58 +1,46 @@
 from Models.TravelSearchState import TravelSearchState
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from Nodes.get_flight_offers_node import extract_hotel_dates_from_flight
+from Utils.package_ranking import rank_packages
 
 def create_packages(state: TravelSearchState) -> TravelSearchState:
-    """Create 3 travel packages by matching flight offers with their corresponding hotel offers."""
+    """Rank flight x hotel x date combinations across the search window and build the top-k travel packages."""
     
-    # Get flight offers for each day
-    flight_day_1 = state.get("flight_offers_day_1", [])
-    flight_day_2 = state.get("flight_offers_day_2", [])  
-    flight_day_3 = state.get("flight_offers_day_3", [])
-    
-    # Get hotel offers for each duration
-    hotel_duration_1 = state.get("hotel_offers_duration_1", [])
-    hotel_duration_2 = state.get("hotel_offers_duration_2", [])
-    hotel_duration_3 = state.get("hotel_offers_duration_3", [])
-    
-    # Get hotel dates for reference
-    checkin_dates = state.get("checkin_date", [])
-    checkout_dates = state.get("checkout_date", [])
+    flight_offers_by_date = state.get("flight_offers_by_date") or {}
+    hotel_offers_by_date = state.get("hotel_offers_by_date") or {}
+    hotel_counts_by_date = state.get("hotel_counts_by_date") or {}
+    stay_windows = state.get("stay_windows") or {}
+    search_dates = [d for d in state.get("search_dates") or [] if d in stay_windows]
+
+    # Hotels were priced for each date's stay window; only flights matching that window can pair with them
+    flights_by_date = {}
+    for search_date in search_dates:
+        window = stay_windows[search_date]
+        flights_by_date[search_date] = [
+            f for f in flight_offers_by_date.get(search_date, [])
+            if extract_hotel_dates_from_flight(f) == (window["checkin"], window["checkout"])
+        ]
+
+    ranked = rank_packages(search_dates, flights_by_date, hotel_offers_by_date)
     
     packages = []
     
-    # Create Package 1: Day 1 flights + Duration 1 hotels
-    package_1 = create_single_package(
-        package_id=1,
-        flights=flight_day_1,
-        hotels=hotel_duration_1,
-        checkin_date=checkin_dates[0] if checkin_dates else None,
-        checkout_date=checkout_dates[0] if checkout_dates else None
-    )
-    if package_1:
-        packages.append(package_1)
-    
-    # Create Package 2: Day 2 flights + Duration 2 hotels
-    package_2 = create_single_package(
-        package_id=2,
-        flights=flight_day_2,
-        hotels=hotel_duration_2,
-        checkin_date=checkin_dates[1] if len(checkin_dates) > 1 else (checkin_dates[0] if checkin_dates else None),
-        checkout_date=checkout_dates[1] if len(checkout_dates) > 1 else (checkout_dates[0] if checkout_dates else None)
-    )
-    if package_2:
-        packages.append(package_2)
-    
-    # Create Package 3: Day 3 flights + Duration 3 hotels
-    package_3 = create_single_package(
-        package_id=3,
-        flights=flight_day_3,
-        hotels=hotel_duration_3,
-        checkin_date=checkin_dates[2] if len(checkin_dates) > 2 else (checkin_dates[0] if checkin_dates else None),
-        checkout_date=checkout_dates[2] if len(checkout_dates) > 2 else (checkout_dates[0] if checkout_dates else None)
-    )
-    if package_3:
-        packages.append(package_3)
+    # Package ids follow rank order
+    for package_id, candidate in enumerate(ranked, start=1):
+        window = stay_windows[candidate["date"]]
+        package = create_single_package(
+            package_id=package_id,
+            flights=[candidate["flight"]],
+            hotels=candidate["hotel_options"],
+            checkin_date=window.get("checkin"),
+            checkout_date=window.get("checkout"),
+            hotel_counts=hotel_counts_by_date.get(candidate["date"])
+        )
+        if package:
+            package["score"] = candidate["score"]
+            package["score_features"] = candidate["features"]
+            packages.append(package)
     
     # Save packages to state
     state["travel_packages"] = packages
@@ -62,6 +50,7 @@ def create_packages(state: TravelSearchState) -> TravelSearchState:
             pricing = pkg.get("pricing", {}) if isinstance(pkg, dict) else {}
             print(
                 f"package {pkg.get('package_id')}: total_min_price={pricing.get('total_min_price')} {pricing.get('currency')}"
+                f" score={pkg.get('score', {}).get('total')}"
             )
     except Exception as _:
         print("create_packages: error while printing packages debug info")
@@ -70,8 +59,13 @@ def create_packages(state: TravelSearchState) -> TravelSearchState:
 
 
 def create_single_package(package_id: int, flights: List[Dict[str, Any]], hotels: List[Dict[str, Any]], 
-                         checkin_date: str, checkout_date: str) -> Dict[str, Any]:
-    """Create a single travel package from flight and hotel data."""
+                         checkin_date: str, checkout_date: str,
+                         hotel_counts: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """
+    Create a single travel package from flight and hotel data.
+    hotels are the options to show, best first; hotel_counts ({"found", "available"}) is how many were
+    priced for the stay, which defaults to counting hotels.
+    """
     
     if not flights or not checkin_date or not checkout_date:
         print(f"Insufficient data for package {package_id}")
@@ -93,9 +87,12 @@ def create_single_package(package_id: int, flights: List[Dict[str, Any]], hotels
         
         # Process hotel data
         available_hotels = [h for h in hotels if h.get("available", True) and h.get("best_offers")]
-        total_hotels = len(hotels)
+        if hotel_counts is None:
+            hotel_counts = {"found": len(hotels), "available": len(available_hotels)}
+        total_hotels = hotel_counts["found"]
+        available_count = hotel_counts["available"]
         
-        # Find minimum hotel price
+        # Price of the leading (top-ranked) hotel
         min_hotel_price = 0
         if available_hotels and available_hotels[0].get("best_offers"):
             min_hotel_price = float(available_hotels[0]["best_offers"][0]["offer"].get("price", {}).get("total", 0))
@@ -119,8 +116,8 @@ def create_single_package(package_id: int, flights: List[Dict[str, Any]], hotels
             },
             "hotels": {
                 "total_found": total_hotels,
-                "available_count": len(available_hotels),
-                "top_options": available_hotels[:5],  # Top 5 cheapest
+                "available_count": available_count,
+                "top_options": available_hotels[:5],  # Top 5 options, best first
                 "min_price": min_hotel_price,
                 "currency": "EGP"
             },
@@ -130,7 +127,7 @@ def create_single_package(package_id: int, flights: List[Dict[str, Any]], hotels
                 "total_min_price": flight_price + min_hotel_price,
                 "currency": flight_currency
             },
-            "package_summary": f"Package {package_id}: {duration_nights} nights, {len(available_hotels)} hotels available from {min_hotel_price} EGP"
+            "package_summary": f"Package {package_id}: {duration_nights} nights, {available_count} hotels available from {min_hotel_price} EGP"
         }
         
         return package
@@ -1,6 +1,10 @@
 from datetime import datetime, timedelta
+import os
 from Models.TravelSearchState import TravelSearchState
 
+# Flight offers requested per departure date; create_packages ranks them against the hotels
+FLIGHT_MAX_OFFERS = int(os.getenv("FLIGHT_MAX_OFFERS", "5"))
+
 def format_body_node(state: TravelSearchState) -> TravelSearchState:
     """Format the request body for Amadeus API"""
 
@@ -32,7 +36,7 @@ def format_body_node(state: TravelSearchState) -> TravelSearchState:
             "travelers": [{"id": "1", "travelerType": "ADULT"}],
             "sources": ["GDS"],
             "searchCriteria": {
-                "maxFlightOffers": 1, #this will return the cheapest flight
+                "maxFlightOffers": FLIGHT_MAX_OFFERS,
                 "flightFilters": {
                     "cabinRestrictions": [{
                         "cabin": cabin,
@@ -1,42 +1,44 @@
 from Models.TravelSearchState import TravelSearchState
-import requests
-from Nodes.get_access_token_node import get_access_token_node
+from Utils.amadeus_client import amadeus_request
+from Utils.hotel_id_cache import hotel_id_cache
+import os
 
+# Cap on hotels priced per city (0 = the full list). At 10 hotel-offers requests/s and a 10s pricing
+# deadline, ~100 requests fit: 600 IDs is 30 chunks of 20 for each of a default 3-window search
+HOTEL_MAX_IDS = int(os.getenv("HOTEL_MAX_IDS", "600"))
 
-def get_city_IDs_node(state: TravelSearchState) -> TravelSearchState:
-    """Get city IDs using Amadeus API for hotel search based on flight results."""
 
-    url = "https://test.api.amadeus.com/v1/reference-data/locations/hotels/by-city"
-    headers = {
-        "Authorization": f"Bearer {state['access_token']}",
-        "Content-Type": "application/json"
-    }
-    params = {
-        "cityCode": state.get("destination_location_code", "")
-    }
+async def get_city_IDs_node(state: TravelSearchState) -> dict:
+    """Get city IDs using Amadeus API for hotel search; runs in parallel with the flight search."""
+
+    city_code = state.get("destination_location_code") or ""
 
+    # Only needs the destination code, so return just the keys this branch owns
+    update = {"current_node": "get_city_ids"}
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=100)
-        if response.status_code == 401:
-            # Token expired, get a new one
-            state = get_access_token_node(state)  # Refresh token
-            headers["Authorization"] = f"Bearer {state['access_token']}"
-            response = requests.get(url, headers=headers, params=params, timeout=100)
-        response.raise_for_status()
-        data = response.json()
-
-        hotels_data = data.get("data", [])
-
-        hotel_ids = []
-        for hotel in hotels_data:
-            hotel_id = hotel.get("hotelId")
-            if hotel_id:
-                hotel_ids.append(hotel_id)
-        hotel_ids = hotel_ids[:20]  # limit to first 20
-        state["hotel_id"] = hotel_ids
+        hotel_ids = await hotel_id_cache.get_or_fetch(city_code, lambda: fetch_city_hotel_ids(city_code))
+        if HOTEL_MAX_IDS > 0:
+            hotel_ids = hotel_ids[:HOTEL_MAX_IDS]
+        update["hotel_id"] = hotel_ids
     except Exception as e:
         print(f"Error getting hotel IDs: {e}")
-        state["followup_question"] = "Sorry, I had trouble finding hotels in your city. Please try again later."
-        state["hotel_id"] = []
+        update["followup_question"] = "Sorry, I had trouble finding hotels in your city. Please try again later."
+        update["hotel_id"] = []
+
+    return update
+
+async def fetch_city_hotel_ids(city_code: str) -> list:
+    """Fetch every hotel ID Amadeus lists for a city code."""
+    params = {
+        "cityCode": city_code
+    }
+    response = await amadeus_request("GET", "/v1/reference-data/locations/hotels/by-city", params=params)
+    response.raise_for_status()
+    data = response.json()
 
-    return state
+    hotel_ids = []
+    for hotel in data.get("data", []):
+        hotel_id = hotel.get("hotelId")
+        if hotel_id:
+            hotel_ids.append(hotel_id)
+    return hotel_ids
\ No newline at end of file
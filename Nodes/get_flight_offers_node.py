@@ -1,27 +1,32 @@
 from Models.TravelSearchState import TravelSearchState
-import requests
+import copy
+import os
 from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from Utils.amadeus_client import amadeus_request
+from Utils.search_window import gather_bounded, search_dates
+from Utils.single_flight import SingleFlight
+from Utils.ttl_cache import TTLCache
+
+# Shared cache of flight-offer search results, keyed by the normalized search body
+flight_offers_cache = TTLCache(
+    ttl_seconds=float(os.getenv("FLIGHT_CACHE_TTL", "300")),
+    max_entries=int(os.getenv("FLIGHT_CACHE_MAX_ENTRIES", "1000")),
+    max_bytes=int(os.getenv("FLIGHT_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+)
+# Identical searches already in flight (same key as the cache) share one upstream request
+flight_offers_inflight = SingleFlight()
+
+async def get_flight_offers_node(state: TravelSearchState) -> dict:
+    """Get flight offers from Amadeus API for each date in the flexible-date window and extract hotel dates."""
 
-def get_flight_offers_node(state: TravelSearchState) -> TravelSearchState:
-    """Get flight offers from Amadeus API for 3 consecutive days and extract hotel dates."""
-
-    base_url = "https://test.api.amadeus.com/v2/shopping/flight-offers"
-    headers = {
-        "Authorization": f"Bearer {state['access_token']}",
-        "Content-Type": "application/json"
-    }
-    
     # Use the body from format_body_node
     base_body = state.get("body", {})
-    start_date_str = state.get("normalized_departure_date")
-    start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
+    dates = search_dates(state.get("normalized_departure_date"), state.get("flex_days"))
 
-    # Prepare requests for 3 consecutive days
+    # Prepare one request per departure date in the window
     bodies = []
-    for day_offset in range(0, 3):
-        query_date = (start_date + timedelta(days=day_offset)).strftime("%Y-%m-%d")
-        body = dict(base_body)  # Copy the formatted body
+    for query_date in dates:
+        body = copy.deepcopy(base_body)  # Copy the formatted body (nested dates are edited below)
 
         if body.get("originDestinations"):
             # Update departure date
@@ -33,65 +38,83 @@ def get_flight_offers_node(state: TravelSearchState) -> TravelSearchState:
                 return_date = (dep_date_dt + timedelta(days=int(state.get("duration", 0)))).strftime("%Y-%m-%d")
                 body["originDestinations"][1]["departureDateTimeRange"]["date"] = return_date
 
-        # Set max offers to 1 for cheapest option
+        # Fall back to the cheapest offer only if the body didn't set a count
         body.setdefault("searchCriteria", {}).setdefault("maxFlightOffers", 1)
-        bodies.append((day_offset + 1, query_date, body))
+        bodies.append((query_date, body))
 
-    def fetch_for_day(day_info):
-        day_number, search_date, body = day_info
+    async def fetch_for_date(search_date, body):
         try:
-            resp = requests.post(base_url, headers=headers, json=body, timeout=100)
-            resp.raise_for_status()
-            data = resp.json()
-            flights = data.get("data", []) or []
-            
+            cache_key = flight_search_key(body)
+            cached = flight_offers_cache.get(cache_key)
+            if cached is None:
+                cached = await flight_offers_inflight.do(cache_key, lambda: search_flight_offers(cache_key, body))
+            else:
+                print(f"get_flight_offers_node: cache hit for {search_date}")
+
+            # Work on a copy so per-request metadata never leaks into the cache
+            flights = copy.deepcopy(cached)
+
             # Add metadata to flights
             for f in flights:
                 f["_search_date"] = search_date
-                f["_day_number"] = day_number
             
-            return day_number, flights
+            return search_date, flights
         except Exception as exc:
-            print(f"Error getting flight offers for day {day_number} ({search_date}): {exc}")
-            return day_number, []
-
-    # Parallel search across 3 days
-    checkin_dates = []
-    checkout_dates = []
-    
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        futures = [executor.submit(fetch_for_day, body_info) for body_info in bodies]
-        
-        for fut in as_completed(futures):
-            day_number, flights = fut.result()
-            
-            # Save flight offers by day
-            if day_number == 1:
-                state["flight_offers_day_1"] = flights
-            elif day_number == 2:
-                state["flight_offers_day_2"] = flights
-            elif day_number == 3:
-                state["flight_offers_day_3"] = flights
-            
-            # Extract hotel dates from flight offers
-            for flight in flights:
-                checkin_date, checkout_date = extract_hotel_dates_from_flight(flight)
-                if checkin_date and checkout_date:
-                    checkin_dates.append(checkin_date)
-                    checkout_dates.append(checkout_date)
-
-    # Save extracted hotel dates
-    state["checkin_date"] = checkin_dates
-    state["checkout_date"] = checkout_dates
-    
-    # Keep legacy format for compatibility (all flights combined)
-    all_results = []
-    for day_key in ["flight_offers_day_1", "flight_offers_day_2", "flight_offers_day_3"]:
-        if state.get(day_key):
-            all_results.extend(state[day_key])
-    state["result"] = {"data": all_results}
-    
-    return state
+            print(f"Error getting flight offers for {search_date}: {exc}")
+            return search_date, []
+
+    # Concurrent search across the window, bounded so wide windows don't burst upstream
+    results = await gather_bounded(fetch_for_date(*body_info) for body_info in bodies)
+    print(f"get_flight_offers_node: searched {len(dates)} dates ({dates[0]} to {dates[-1]})")
+
+    flight_offers_by_date = {}
+    stay_windows = {}
+    for search_date, flights in results:
+        flight_offers_by_date[search_date] = flights
+
+        # Hotel stay follows the cheapest flight's arrival / return departure (offers come cheapest first)
+        for flight in flights:
+            checkin_date, checkout_date = extract_hotel_dates_from_flight(flight)
+            if checkin_date and checkout_date:
+                stay_windows[search_date] = {"checkin": checkin_date, "checkout": checkout_date}
+                break
+
+    # Runs in parallel with get_city_ids, so return only the keys this node owns
+    return {
+        "search_dates": dates,
+        "flight_offers_by_date": flight_offers_by_date,
+        "stay_windows": stay_windows,
+        "current_node": "get_flight_offers",
+    }
+
+
+async def search_flight_offers(cache_key, body):
+    """Run one flight-offers search upstream and cache the offers under cache_key."""
+    resp = await amadeus_request("POST", "/v2/shopping/flight-offers", json=body)
+    resp.raise_for_status()
+    data = resp.json()
+    offers = data.get("data", []) or []
+    flight_offers_cache.set(cache_key, offers)
+    return offers
+
+
+def flight_search_key(body):
+    """Build a hashable cache key from the search-relevant fields of a format_body_node body."""
+    legs = tuple(
+        (
+            (od.get("originLocationCode") or "").upper(),
+            (od.get("destinationLocationCode") or "").upper(),
+            od.get("departureDateTimeRange", {}).get("date"),
+        )
+        for od in body.get("originDestinations", [])
+    )
+    criteria = body.get("searchCriteria", {})
+    cabins = tuple(sorted(
+        (r.get("cabin") or "").upper()
+        for r in criteria.get("flightFilters", {}).get("cabinRestrictions", [])
+    ))
+    travelers = tuple(sorted(t.get("travelerType", "") for t in body.get("travelers", [])))
+    return (legs, cabins, travelers, body.get("currencyCode"), criteria.get("maxFlightOffers"))
 
 
 def extract_hotel_dates_from_flight(flight_offer):
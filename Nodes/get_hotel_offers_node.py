@@ -1,116 +1,220 @@
 from Models.TravelSearchState import TravelSearchState
-import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
 from collections import defaultdict
+import os
+import time
 
-def get_hotel_offers_node(state: TravelSearchState) -> TravelSearchState:
-    """Get hotel offers for 3 durations in parallel using extracted flight dates."""
-    
-    url = "https://test.api.amadeus.com/v3/shopping/hotel-offers"
-    headers = {
-        "Authorization": f"Bearer {state['access_token']}",
-        "Content-Type": "application/json"
-    }
+try:
+    import numpy as np
+except ImportError:  # optional: fall back to the pure-Python grouping
+    np = None
+
+from Utils.amadeus_client import amadeus_request
+from Utils.search_window import SEARCH_MAX_CONCURRENCY
+from Utils.single_flight import SingleFlight
+from Utils.ttl_cache import TTLCache
+
+# Shared read-only default for missing nested objects
+_EMPTY = {}
+
+# Short-lived cache of raw hotel offers, keyed by (hotel ID chunk, check-in, check-out, currency)
+hotel_offers_cache = TTLCache(
+    ttl_seconds=float(os.getenv("HOTEL_OFFERS_CACHE_TTL", "120")),
+    max_entries=int(os.getenv("HOTEL_OFFERS_CACHE_MAX_ENTRIES", "500")),
+    max_bytes=int(os.getenv("HOTEL_OFFERS_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+# Identical hotel-offer lookups already in flight share one upstream request
+hotel_offers_inflight = SingleFlight()
+
+# Hotels per hotel-offers request, hotels kept per stay window, and the overall pricing deadline (seconds)
+HOTEL_CHUNK_SIZE = max(1, int(os.getenv("HOTEL_CHUNK_SIZE", "20")))
+HOTEL_TOP_K = int(os.getenv("HOTEL_TOP_K", "50"))
+HOTEL_SEARCH_DEADLINE = float(os.getenv("HOTEL_SEARCH_DEADLINE", "10"))
+
+async def get_hotel_offers_node(state: TravelSearchState) -> TravelSearchState:
+    """Get hotel offers for every departure date's stay window in parallel using extracted flight dates."""
     
     hotel_ids = state.get("hotel_id", [])
-    checkin_dates = state.get("checkin_date", [])
-    checkout_dates = state.get("checkout_date", [])
+    stay_windows = state.get("stay_windows") or {}
     
     if not hotel_ids:
         print("No hotel IDs available for hotel search")
-        state["hotel_offers_duration_1"] = []
-        state["hotel_offers_duration_2"] = []
-        state["hotel_offers_duration_3"] = []
+        state["hotel_offers_by_date"] = {}
+        state["hotel_counts_by_date"] = {}
+        state["hotel_offers"] = []
         return state
     
-    if not checkin_dates or not checkout_dates or len(checkin_dates) != len(checkout_dates):
-        print("Missing or mismatched hotel dates")
-        state["hotel_offers_duration_1"] = []
-        state["hotel_offers_duration_2"] = []
-        state["hotel_offers_duration_3"] = []
+    if not stay_windows:
+        print("Missing hotel dates")
+        state["hotel_offers_by_date"] = {}
+        state["hotel_counts_by_date"] = {}
+        state["hotel_offers"] = []
         return state
 
-    # Prepare requests for up to 3 durations
-    duration_requests = []
-    for i in range(min(3, len(checkin_dates))):
-        duration_requests.append({
-            "duration_number": i + 1,
-            "checkin": checkin_dates[i],
-            "checkout": checkout_dates[i]
-        })
-    
-    # Fill remaining slots if we have less than 3
-    while len(duration_requests) < 3:
-        # Use the last available date range
-        if duration_requests:
-            last_request = duration_requests[-1]
-            duration_requests.append({
-                "duration_number": len(duration_requests) + 1,
-                "checkin": last_request["checkin"], 
-                "checkout": last_request["checkout"]
-            })
-        else:
-            # No dates available, use empty
-            duration_requests.append({
-                "duration_number": len(duration_requests) + 1,
-                "checkin": None,
-                "checkout": None
-            })
+    # Price the full hotel list in chunks, so one slow hotel only delays its own chunk
+    unique_ids = sorted(set(hotel_ids))
+    chunks = [tuple(unique_ids[i:i + HOTEL_CHUNK_SIZE]) for i in range(0, len(unique_ids), HOTEL_CHUNK_SIZE)]
+
+    async def fetch_hotel_chunk(chunk, checkin, checkout):
+        """Fetch raw hotel offers for one chunk of hotels and one stay window, using the short-TTL cache."""
+        cache_key = (chunk, checkin, checkout, "EGP")
+        cached = hotel_offers_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-    def fetch_hotels_for_duration(duration_info):
-        """Fetch hotel offers for a specific duration."""
-        duration_num = duration_info["duration_number"]
-        checkin = duration_info["checkin"]
-        checkout = duration_info["checkout"]
-        
-        if not checkin or not checkout:
-            return duration_num, []
-            
         params = {
-            "hotelIds": ",".join(hotel_ids),
+            "hotelIds": ",".join(chunk),
             "checkInDate": checkin,
             "checkOutDate": checkout,
             "currencyCode": "EGP"
         }
-        
-        try:
-            response = requests.get(url, headers=headers, params=params, timeout=100)
+
+        async def search():
+            # Only the leader holds a slot; coalesced callers just wait on its result
+            async with semaphore:
+                response = await amadeus_request("GET", "/v3/shopping/hotel-offers", params=params)
             response.raise_for_status()
             data = response.json()
             hotel_offers = data.get("data", [])
-            
-            # Process hotel offers to find cheapest by room type
-            processed_offers = process_hotel_offers(hotel_offers)
-            
-            return duration_num, processed_offers
-            
-        except Exception as e:
-            print(f"Error getting hotel offers for duration {duration_num} ({checkin} to {checkout}): {e}")
-            return duration_num, []
-    
-    # Parallel hotel search across 3 durations
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        futures = [executor.submit(fetch_hotels_for_duration, duration_info) for duration_info in duration_requests]
+            hotel_offers_cache.set(cache_key, hotel_offers)
+            return hotel_offers
         
-        for fut in as_completed(futures):
-            duration_number, offers = fut.result()
-            
-            # Save hotel offers by duration
-            if duration_number == 1:
-                state["hotel_offers_duration_1"] = offers
-            elif duration_number == 2:
-                state["hotel_offers_duration_2"] = offers
-            elif duration_number == 3:
-                state["hotel_offers_duration_3"] = offers
+        return await hotel_offers_inflight.do(cache_key, search)
+
+    # Departure dates can map to the same stay window (e.g. overnight arrivals): request each window once
+    windows = list(dict.fromkeys((w["checkin"], w["checkout"]) for w in stay_windows.values()))
+    semaphore = asyncio.Semaphore(max(1, SEARCH_MAX_CONCURRENCY))
+    # Chunk-outer, window-inner: slots are granted in submission order, so every window gets
+    # its share of chunks priced before the deadline instead of the first window taking them all
+    tasks = {
+        asyncio.ensure_future(fetch_hotel_chunk(chunk, *window)): window
+        for chunk in chunks for window in windows
+    }
+    raw_by_window = {window: [] for window in windows}
+    print(f"get_hotel_offers_node: {len(windows)} unique stay windows for {len(stay_windows)} dates, "
+          f"{len(unique_ids)} hotels in {len(chunks)} chunks")
+
+    # Collect chunks as they finish; at the deadline keep what has arrived
+    deadline = time.monotonic() + HOTEL_SEARCH_DEADLINE
+    pending = set(tasks)
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            checkin, checkout = tasks[task]
+            try:
+                raw_by_window[(checkin, checkout)].extend(task.result())
+            except Exception as e:
+                print(f"Error getting hotel offers for {checkin} to {checkout}: {e}")
+    if pending:
+        print(f"get_hotel_offers_node: deadline reached, {len(pending)}/{len(tasks)} chunks still pending")
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    # One vectorized pass per window over every priced hotel; only the cheapest HOTEL_TOP_K are built out
+    offers_by_window = {window: process_hotel_offers(raw, top_k=HOTEL_TOP_K) for window, raw in raw_by_window.items()}
+    # Hotels priced per window before the top-k cut, for "N hotels available" in the packages
+    counts_by_window = {
+        window: {"found": len(raw), "available": sum(1 for h in raw if h.get("available", True) and h.get("offers"))}
+        for window, raw in raw_by_window.items()
+    }
+
+    # Fan the results back out to every departure date
+    state["hotel_offers_by_date"] = {
+        search_date: offers_by_window.get((w["checkin"], w["checkout"]), [])
+        for search_date, w in stay_windows.items()
+    }
+    state["hotel_counts_by_date"] = {
+        search_date: dict(counts_by_window.get((w["checkin"], w["checkout"]), {"found": 0, "available": 0}))
+        for search_date, w in stay_windows.items()
+    }
     
-    # Keep legacy format for compatibility (use first duration)
-    state["hotel_offers"] = state.get("hotel_offers_duration_1", [])
+    # Keep legacy format for compatibility (use first date)
+    state["hotel_offers"] = next(iter(state["hotel_offers_by_date"].values()), [])
     
     return state
 
 
-def process_hotel_offers(hotel_offers):
-    """Process hotel offers to find cheapest offer by room type for each hotel."""
+def process_hotel_offers(hotel_offers, top_k=None):
+    """
+    Process hotel offers to find cheapest offer by room type for each hotel.
+    Hotels come back cheapest first, each with its best offer per room type, cheapest first.
+    With top_k, only the top_k cheapest hotels are returned (and only they are grouped by room type).
+    """
+    if np is None:
+        processed = process_hotel_offers_python(hotel_offers)
+        return processed if top_k is None else processed[:top_k]
+
+    # Parse every offer once into columns: price, owning hotel, room-type code
+    offers, hotel_index = [], []
+    for h, hotel in enumerate(hotel_offers):
+        if not hotel.get("available", True):
+            continue
+        hotel_list = hotel.get("offers") or []
+        offers.extend(hotel_list)
+        hotel_index.extend([h] * len(hotel_list))
+    room_types = [offer.get("room", _EMPTY).get("type", "UNKNOWN") for offer in offers]
+    room_type_codes = {}
+    room_codes = [room_type_codes.setdefault(room_type, len(room_type_codes)) for room_type in room_types]
+
+    hotel_min = np.full(len(hotel_offers), np.inf)
+    if offers:
+        # Totals are decimal strings; NumPy converts the whole column in one call
+        price = np.array([offer.get("price", _EMPTY).get("total", "inf") for offer in offers], dtype=np.float64)
+        hotel_col = np.asarray(hotel_index, dtype=np.int64)
+        np.minimum.at(hotel_min, hotel_col, price)
+
+    # Sort hotels by their cheapest offer (stable: hotels without offers keep their order at the end)
+    hotel_order = np.argsort(hotel_min, kind="stable")
+    if top_k is not None:
+        hotel_order = hotel_order[:max(0, top_k)]
+
+    best_by_hotel = {}
+    if offers and len(hotel_order):
+        # Only the kept hotels' offers are grouped; rows index the offer columns
+        kept = np.zeros(len(hotel_offers), dtype=bool)
+        kept[hotel_order] = True
+        rows = np.flatnonzero(kept[hotel_col])
+        row_price = price[rows]
+        row_hotel = hotel_col[rows]
+        group = row_hotel * len(room_type_codes) + np.asarray(room_codes, dtype=np.int64)[rows]
+
+        # Group-by-min: order by (group, price, position) and keep each group's first row,
+        # i.e. the cheapest offer per hotel and room type (earliest wins ties, like min())
+        order = np.lexsort((rows, row_price, group))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = group[order][1:] != group[order][:-1]
+        winners = order[first]
+
+        # Best offers per hotel: cheapest first, ties in the order room types first appear
+        groups, first_seen = np.unique(group, return_index=True)
+        winner_first_seen = first_seen[np.searchsorted(groups, group[winners])]
+        winners = winners[np.lexsort((winner_first_seen, row_price[winners], row_hotel[winners]))]
+
+        # Each hotel's run of winners starts with its cheapest offer
+        winner_hotels = row_hotel[winners]
+        starts = np.flatnonzero(np.r_[True, winner_hotels[1:] != winner_hotels[:-1]])
+        winner_rows = rows[winners].tolist()
+        bounds = starts.tolist() + [len(winner_rows)]
+        for h, start, end in zip(winner_hotels[starts].tolist(), bounds, bounds[1:]):
+            best_by_hotel[h] = [{"room_type": room_types[i], "offer": offers[i]} for i in winner_rows[start:end]]
+
+    processed = []
+    for h in hotel_order.tolist():
+        hotel = hotel_offers[h]
+        processed.append({
+            "hotel": hotel.get("hotel", {}),
+            "available": hotel.get("available", True),
+            "best_offers": best_by_hotel.get(h, [])
+        })
+    return processed
+
+
+def process_hotel_offers_python(hotel_offers):
+    """Pure-Python process_hotel_offers (used when NumPy is unavailable, and as the benchmark baseline)."""
     processed = []
     
     for hotel in hotel_offers:
@@ -4,10 +4,22 @@ from Models.TravelSearchState import TravelSearchState
 from langchain.schema import HumanMessage
 from Utils.getLLM import get_llm_json
 from Prompts.llm_conversation import build_input_extraction_prompt
+from Utils.tokens import count_tokens
+from Utils.slot_parser import parse_slots
 
-def llm_conversation_node(state: TravelSearchState) -> TravelSearchState:
+async def llm_conversation_node(state: TravelSearchState) -> TravelSearchState:
     """LLM-driven conversational node that intelligently handles all user input parsing and follow-up questions."""
 
+    # Fast path: trivially parseable answers ("5 days", "CAI", "from Cairo to Dubai") skip the LLM
+    fast_slots = parse_slots(state.get("current_message", ""), state)
+    if fast_slots is not None:
+        print(f"llm_conversation_node: fast path filled {sorted(fast_slots)}")
+        state.update(fast_slots)
+        # analyze_conversation crafts the next question from whatever is still missing
+        state["followup_question"] = None
+        state["current_node"] = "llm_conversation"
+        return state
+
     try:
         if not os.getenv("OPENAI_API_KEY"):
             state["followup_question"] = "I need an OpenAI API key to help you with flight bookings."
@@ -16,8 +28,10 @@ def llm_conversation_node(state: TravelSearchState) -> TravelSearchState:
             return state
 
         llm_prompt = build_input_extraction_prompt(state)
+        state["prompt_tokens"] = count_tokens(llm_prompt)
+        print(f"llm_conversation_node: extraction prompt is {state['prompt_tokens']} tokens")
         print("llm_conversation_node: using JSON-mode LLM (response_format=json_object)")
-        response = get_llm_json().invoke([HumanMessage(content=llm_prompt)])
+        response = await get_llm_json(cache=True).ainvoke([HumanMessage(content=llm_prompt)])
         print(f"llm_conversation_node: got response length={len(response.content) if hasattr(response, 'content') else 'n/a'}")
 
         try:
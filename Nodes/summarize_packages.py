@@ -1,14 +1,13 @@
-from Models.TravelSearchState import TravelSearchState
+from typing import Any, AsyncIterator, Dict, List
 from Utils.getLLM import get_text_llm
 from Prompts.summary_prompt import summary_prompt
 from langchain.schema import HumanMessage
 
-def summarize_packages(state: TravelSearchState) -> TravelSearchState:
-    """Generate LLM summary and recommendation for travel packages."""
-
-
-    # Get the 3 travel packages
-    travel_packages = state.get("travel_packages", [])
+async def stream_package_summary(travel_packages: List[Dict[str, Any]]) -> AsyncIterator[str]:
+    """
+    Generate the LLM summary and recommendation for travel packages, yielding text as it streams.
+    Runs off the request path (background task or SSE stream), not as a graph node.
+    """
     try:
         print(f"summarize_packages: received {len(travel_packages)} packages")
         if travel_packages:
@@ -20,30 +19,25 @@ def summarize_packages(state: TravelSearchState) -> TravelSearchState:
         print("summarize_packages: error while printing package debug info")
     
     if not travel_packages or len(travel_packages) == 0:
-        state["package_summary"] = "No travel packages found for your search. Please try different dates or destinations."
         print("summarize_packages: no travel packages available")
-        return state
-    
-    # Ensure we have 3 packages (pad with None if needed)
-    package1 = travel_packages[0] if len(travel_packages) > 0 else None
-    package2 = travel_packages[1] if len(travel_packages) > 1 else None
-    package3 = travel_packages[2] if len(travel_packages) > 2 else None
+        yield "No travel packages found for your search. Please try different dates or destinations."
+        return
     
-    # Handle cases where we have fewer than 3 packages
-    if not package1:
-        state["package_summary"] = "No valid travel packages could be created. Please check your search criteria."
-        return state
+    packages = [p for p in travel_packages if p]
+    if not packages:
+        yield "No valid travel packages could be created. Please check your search criteria."
+        return
     
     try:
-        # Generate the prompt with the 3 packages
-        llm_prompt = summary_prompt(package1, package2, package3)
+        # Generate the prompt with every package in the search window
+        llm_prompt = summary_prompt(packages)
         
         # Use OpenAI LLM to generate summary
         print("summarize_packages: using text LLM for summary")
-        response = get_text_llm().invoke([HumanMessage(content=llm_prompt)])
-        state["package_summary"] = response.content
-        
-        print("Generated package summary:", response.content)
+        # Deliberately uncached: the summary is open-ended text over live prices
+        async for chunk in get_text_llm().astream([HumanMessage(content=llm_prompt)]):
+            if chunk.content:
+                yield chunk.content
         
     except Exception as e:
         print(f"Error generating package summary: {e}")
@@ -51,11 +45,14 @@ def summarize_packages(state: TravelSearchState) -> TravelSearchState:
         traceback.print_exc()
         
         # Fallback summary if LLM fails
-        fallback_summary = create_fallback_summary(travel_packages)
-        state["package_summary"] = fallback_summary
+        yield create_fallback_summary(travel_packages)
+
 
-    state["current_node"] = "summarize_packages_node"
-    return state
+async def generate_package_summary(travel_packages: List[Dict[str, Any]]) -> str:
+    """Generate the complete package summary text."""
+    summary = "".join([chunk async for chunk in stream_package_summary(travel_packages)])
+    print("Generated package summary:", summary)
+    return summary
 
 
 def create_fallback_summary(packages):
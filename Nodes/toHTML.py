@@ -1,41 +1,155 @@
-from typing import List, Optional, Any
+from typing import Dict, List, Optional, Any
 from html import escape
 from Models.ExtractedInfo import ExtractedInfo
 from Utils.get_html_attributes import get_html_attributes
 from Models.TravelSearchState import TravelSearchState
+from Prompts.summary_prompt import project_package
 from typing import Any, List
 from dataclasses import dataclass, field
+from string import Template
+from urllib.parse import quote
 import html
+import os
 
 
-def toHTML(state: TravelSearchState) -> TravelSearchState:
-    def dict_to_table(data: dict) -> str:
-        rows = []
-        for key, value in data.items():
-            if isinstance(value, dict):
-                value_html = dict_to_table(value)
-            elif isinstance(value, list):
-                value_html = "<table border='1'>" + "".join(
-                    "<tr><td>" + dict_to_table(item) + "</td></tr>" if isinstance(item, dict)
-                    else f"<tr><td>{html.escape(str(item))}</td></tr>"
-                    for item in value
-                ) + "</table>"
-            else:
-                value_html = html.escape(str(value))
-            rows.append(f"<tr><td>{html.escape(str(key))}</td><td>{value_html}</td></tr>")
-        return "<table border='1'>" + "".join(rows) + "</table>"
+def dict_to_table(data: dict) -> str:
+    """Render an arbitrary dict as nested tables (used for the on-demand raw package details)."""
+    rows = []
+    for key, value in data.items():
+        if isinstance(value, dict):
+            value_html = dict_to_table(value)
+        elif isinstance(value, list):
+            value_html = "<table border='1'>" + "".join(
+                "<tr><td>" + dict_to_table(item) + "</td></tr>" if isinstance(item, dict)
+                else f"<tr><td>{html.escape(str(item))}</td></tr>"
+                for item in value
+            ) + "</table>"
+        else:
+            value_html = html.escape(str(value))
+        rows.append(f"<tr><td>{html.escape(str(key))}</td><td>{value_html}</td></tr>")
+    return "<table border='1'>" + "".join(rows) + "</table>"
+
+
+# Byte budget per rendered package card; hotel rows are dropped until the card fits
+HTML_PACKAGE_MAX_BYTES = int(os.getenv("HTML_PACKAGE_MAX_BYTES", "6144"))
+HTML_MAX_HOTELS = int(os.getenv("HTML_MAX_HOTELS", "5"))
+
+# Parsed once at import; rendering is plain substitution
+PACKAGE_CARD = Template(
+    "<div class='package-card' data-package-id='$package_id'>"
+    "<div class='package-header'><h3>Package $package_id</h3>"
+    "<p>$checkin &rarr; $checkout &middot; $nights nights</p>"
+    "<p class='package-price'>From <strong>$total $currency</strong></p></div>"
+    "<div class='package-flight'><h4>Flight &middot; $flight_price $currency</h4>$legs</div>"
+    "<div class='package-hotels'><h4>Hotels &middot; $hotels_available available</h4>"
+    "<table class='hotel-options'><tr><th>Hotel</th><th>Rating</th><th>Room</th><th>Board</th><th>Price</th></tr>"
+    "$hotel_rows</table>$more_hotels</div>"
+    "$details_link</div>"
+)
+LEG_ROW = Template(
+    "<p class='flight-leg'><strong>$label:</strong> $origin $departs &rarr; $destination $arrives"
+    " &middot; $duration &middot; $stops &middot; $airlines</p>"
+)
+HOTEL_ROW = Template(
+    "<tr><td>$name</td><td>$rating</td><td>$room</td><td>$board</td><td>$price $currency</td></tr>"
+)
+MORE_HOTELS = Template("<p class='more-hotels'>+$count more hotels</p>")
+DETAILS_LINK = Template("<a class='package-details' href='/api/packages/$thread_id/$package_id'>Full details</a>")
+
+
+def _text(value: Any, default: str = "N/A") -> str:
+    return html.escape(str(value)) if value not in (None, "") else default
+
+
+def _time(value: Optional[str]) -> str:
+    # "2026-12-03T10:00:00" -> "2026-12-03 10:00"
+    return _text(value.replace("T", " ")[:16]) if value else "N/A"
+
+
+def _stops(stops: Optional[int]) -> str:
+    if stops is None:
+        return "N/A"
+    return "Direct" if stops == 0 else f"{stops} stop{'s' if stops != 1 else ''}"
+
+
+def _render_leg(label: str, leg: Optional[Dict[str, Any]]) -> str:
+    if not leg:
+        return ""
+    return LEG_ROW.substitute(
+        label=label,
+        origin=_text(leg.get("from")),
+        departs=_time(leg.get("departs")),
+        destination=_text(leg.get("to")),
+        arrives=_time(leg.get("arrives")),
+        duration=_text((leg.get("duration") or "").replace("PT", "").lower() or None),
+        stops=_stops(leg.get("stops")),
+        airlines=_text(", ".join(leg.get("airlines") or []) or None),
+    )
 
+
+def _render_card(view: Dict[str, Any], thread_id: Optional[str]) -> str:
+    dates = view.get("dates") or {}
+    flight = view.get("flight") or {}
+    hotels = view.get("hotels") or {}
+    top = hotels.get("top") or []
+    available = hotels.get("available") or 0
+    return PACKAGE_CARD.substitute(
+        package_id=_text(view.get("package_id")),
+        checkin=_text(dates.get("checkin")),
+        checkout=_text(dates.get("checkout")),
+        nights=_text(dates.get("duration_nights")),
+        total=_text(view.get("total_min_price")),
+        currency=_text(view.get("currency"), ""),
+        flight_price=_text(flight.get("price")),
+        legs=_render_leg("Outbound", flight.get("outbound")) + _render_leg("Return", flight.get("return")),
+        hotels_available=_text(available, "0"),
+        hotel_rows="".join(
+            HOTEL_ROW.substitute(
+                name=_text(h.get("name")),
+                rating=_text(h.get("rating")),
+                room=_text(h.get("room")),
+                board=_text(h.get("board")),
+                price=_text(h.get("price")),
+                currency=_text(h.get("currency"), ""),
+            )
+            for h in top
+        ),
+        more_hotels=MORE_HOTELS.substitute(count=available - len(top)) if available > len(top) else "",
+        details_link=DETAILS_LINK.substitute(
+            thread_id=quote(thread_id, safe=""), package_id=_text(view.get("package_id"))
+        ) if thread_id else "",
+    )
+
+
+def package_to_html(package: Dict[str, Any], thread_id: Optional[str] = None, max_bytes: int = HTML_PACKAGE_MAX_BYTES) -> str:
+    """Render one package as a compact card, dropping hotel rows until it fits in max_bytes."""
+    for max_hotels in range(HTML_MAX_HOTELS, -1, -1):
+        card = _render_card(project_package(package, max_hotels), thread_id)
+        if len(card.encode("utf-8")) <= max_bytes:
+            return card
+    return card
+
+
+def packages_to_html(travel_packages: List[Any], thread_id: Optional[str] = None) -> List[str]:
+    """
+    Render packages to a list of HTML snippets (shared by the to_html node and the streaming endpoint).
+    The raw offers are not rendered; they are served by /api/packages/{thread_id}/{package_id}.
+    """
+    return [
+        package_to_html(pkg, thread_id) if isinstance(pkg, dict) else html.escape(str(pkg))
+        for pkg in travel_packages
+    ]
+
+
+def toHTML(state: TravelSearchState) -> TravelSearchState:
     # Render packages to HTML string list
     travel_packages = state.get("travel_packages", [])
     try:
         print(f"toHTML: received {len(travel_packages)} packages")
     except Exception as _:
         print("toHTML: unable to determine package count")
-    html_packages = [
-        dict_to_table(pkg) if isinstance(pkg, dict) else html.escape(str(pkg))
-        for pkg in travel_packages
-    ]
-    print(f"toHTML: built {len(html_packages)} html snippets")
+    html_packages = packages_to_html(travel_packages, state.get("thread_id"))
+    print(f"toHTML: built {len(html_packages)} html snippets ({sum(len(h) for h in html_packages)} chars)")
 
     # Attach HTML to state and continue
     state["travel_packages_html"] = html_packages
@@ -1,27 +1,89 @@
+import os
 from datetime import datetime
+from typing import Any, Dict, List, Tuple
 from Models.TravelSearchState import TravelSearchState
+from Utils.tokens import count_tokens, truncate_to_tokens
+
+# Most recent conversation messages kept verbatim; older ones collapse into a slot summary
+HISTORY_VERBATIM_MESSAGES = int(os.getenv("HISTORY_VERBATIM_MESSAGES", "4"))
+# Hard ceiling on the extraction prompt size
+PROMPT_TOKEN_CEILING = int(os.getenv("PROMPT_TOKEN_CEILING", "2000"))
+
+SLOT_FIELDS = ("origin", "destination", "departure_date", "duration", "cabin_class")
+
+
+def summarize_earlier_turns(state: TravelSearchState, omitted_count: int) -> str:
+    """
+    One-line running summary standing in for turns that fell out of the verbatim window.
+    Cached in state and rebuilt only when the omitted turns or the filled slots change.
+    """
+    if omitted_count <= 0:
+        return "None"
+    filled = tuple((field, state.get(field)) for field in SLOT_FIELDS if state.get(field) not in (None, ""))
+    cache_key = [omitted_count, [list(item) for item in filled]]
+    if state.get("history_summary_key") == cache_key and state.get("history_summary"):
+        return state["history_summary"]
+
+    details = "; ".join(f"{field}={value}" for field, value in filled) or "nothing yet"
+    summary = f"{omitted_count} earlier messages omitted. Details already collected from them: {details}."
+    state["history_summary"] = summary
+    state["history_summary_key"] = cache_key
+    return summary
+
+
+def split_history(conversation: List[Dict[str, Any]], keep: int) -> Tuple[int, List[Dict[str, Any]]]:
+    """Return (number of omitted messages, last `keep` messages) excluding the system prompt and current message."""
+    turns = [m for m in conversation if m.get("role") != "system"]
+    # The newest user message is rendered separately as the latest message
+    if turns and turns[-1].get("role") == "user":
+        turns = turns[:-1]
+    recent = turns[-keep:] if keep > 0 else []
+    return len(turns) - len(recent), recent
+
 
 def build_input_extraction_prompt(state: TravelSearchState):
-    """Build the LLM prompt for extracting flight booking information."""
+    """
+    Build the LLM prompt for extracting flight booking information.
+    Keeps the last few turns verbatim, summarizes older ones and enforces PROMPT_TOKEN_CEILING.
+    """
+    user_text = state.get("current_message", "")
+    conversation = state.get("conversation", [])
+
+    # Drop verbatim turns (oldest first) until the prompt fits the ceiling
+    for keep in range(HISTORY_VERBATIM_MESSAGES, -1, -1):
+        omitted_count, recent = split_history(conversation, keep)
+        prompt = render_extraction_prompt(state, summarize_earlier_turns(state, omitted_count), recent, user_text)
+        if count_tokens(prompt) <= PROMPT_TOKEN_CEILING:
+            return prompt
+
+    # Still too large: the new message itself is oversized, so truncate it
+    overflow = count_tokens(prompt) - PROMPT_TOKEN_CEILING
+    user_text = truncate_to_tokens(user_text, max(count_tokens(user_text) - overflow, 0))
+    return render_extraction_prompt(state, summarize_earlier_turns(state, omitted_count), [], user_text)
+
+
+def render_extraction_prompt(state: TravelSearchState, history_summary: str, recent: List[Dict[str, Any]], user_text: str) -> str:
+    """Render the extraction prompt template for a given history window."""
     current_date = datetime.now()
     current_date_str = current_date.strftime("%Y-%m-%d")
     current_month = current_date.month
     current_day = current_date.day
     current_year = current_date.year
 
-    conversation_text = "".join(f"{m['role']}: {m['content']}\n" for m in state.get("conversation", []))
-    user_text = state.get("current_message", "")
+    recent_text = "".join(f"{m['role']}: {m['content']}\n        " for m in recent).rstrip() or "None"
 
     return f"""
         You are an expert travel assistant helping users book flights. Today's date is {current_date_str}.
 
-        CONVERSATION SO FAR:
-        {conversation_text}
+        EARLIER CONVERSATION (summary): {history_summary}
+
+        RECENT CONVERSATION:
+        {recent_text}
 
         USER'S LATEST MESSAGE: "{user_text}"
 
         YOUR TASKS:
-        1. Extract/update flight information from the entire conversation
+        1. Update the CURRENT STATE with any flight information in the user's latest message (keep values the user does not change)
         2. Intelligently parse dates and locations 
         3. Ask for ONE missing piece of information OR indicate completion
 
@@ -47,12 +109,12 @@ def build_input_extraction_prompt(state: TravelSearchState):
         5. duration (number of days for round trip)
 
         CURRENT STATE:
-        - departure_date: {state.get('departure_date', 'Not provided')}
-        - origin: {state.get('origin', 'Not provided')}
-        - destination: {state.get('destination', 'Not provided')}
-        - cabin_class: {state.get('cabin_class', 'Not provided')}
-        - duration: {state.get('duration', 'Not provided')}
-        - trip_type: {state.get('trip_type', 'round trip')} (always round trip)
+        - departure_date: {state.get('departure_date') or 'Not provided'}
+        - origin: {state.get('origin') or 'Not provided'}
+        - destination: {state.get('destination') or 'Not provided'}
+        - cabin_class: {state.get('cabin_class') or 'Not provided'}
+        - duration: {state.get('duration') or 'Not provided'}
+        - trip_type: {state.get('trip_type') or 'round trip'} (always round trip)
 
         RESPONSE FORMAT (STRICT JSON ONLY, no prose, no backticks; mention of json here is intentional):
         {{
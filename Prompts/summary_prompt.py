@@ -1,19 +1,92 @@
 import json
+import os
+from typing import Any, Dict, List, Optional
+from Utils.tokens import count_tokens, truncate_to_tokens
 
-def summary_prompt(package1, package2, package3):
+# Hard cap on the tokens spent on package data inside the summary prompt
+SUMMARY_PACKAGES_TOKEN_BUDGET = int(os.getenv("SUMMARY_PACKAGES_TOKEN_BUDGET", "1500"))
+
+
+def _leg_projection(leg: Optional[Dict[str, Any]], itinerary: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not leg:
+        return None
+    segments = (itinerary or {}).get("segments", [])
+    return {
+        "from": leg.get("departure", {}).get("airport"),
+        "to": leg.get("arrival", {}).get("airport"),
+        "departs": leg.get("departure", {}).get("time"),
+        "arrives": leg.get("arrival", {}).get("time"),
+        "duration": leg.get("duration"),
+        "stops": leg.get("stops"),
+        "airlines": sorted({s.get("carrierCode") for s in segments if s.get("carrierCode")}),
+    }
+
+
+def _hotel_projection(hotel: Dict[str, Any]) -> Dict[str, Any]:
+    info = hotel.get("hotel", {})
+    best = (hotel.get("best_offers") or [{}])[0]
+    offer = best.get("offer", {})
+    return {
+        "name": info.get("name"),
+        "rating": info.get("rating"),
+        "room": best.get("room_type"),
+        "board": offer.get("boardType"),
+        "price": offer.get("price", {}).get("total"),
+        "currency": offer.get("price", {}).get("currency"),
+    }
+
+
+def project_package(package: Optional[Dict[str, Any]], max_hotels: int = 3) -> Optional[Dict[str, Any]]:
+    """Reduce a package to the fields the summary actually discusses (no raw Amadeus payloads)."""
+    if not package:
+        return None
+    flight = package.get("flight", {})
+    summary = flight.get("summary", {}) or {}
+    itineraries = (flight.get("offer") or {}).get("itineraries", [])
+    hotels = package.get("hotels", {})
+    return {
+        "package_id": package.get("package_id"),
+        "dates": package.get("travel_dates"),
+        "total_min_price": package.get("pricing", {}).get("total_min_price"),
+        "currency": package.get("pricing", {}).get("currency"),
+        "flight": {
+            "price": flight.get("price"),
+            "outbound": _leg_projection(summary.get("outbound"), itineraries[0] if itineraries else None),
+            "return": _leg_projection(summary.get("return"), itineraries[1] if len(itineraries) > 1 else None),
+        },
+        "hotels": {
+            "available": hotels.get("available_count"),
+            "min_price": hotels.get("min_price"),
+            "top": [_hotel_projection(h) for h in (hotels.get("top_options") or [])[:max_hotels]],
+        },
+    }
+
+
+def _render_packages(packages: List[Optional[Dict[str, Any]]], max_hotels: int) -> str:
+    return "\n\n    ".join(
+        f"Package{i} offers:\n    {json.dumps(project_package(p, max_hotels), separators=(',', ':'), default=str)}"
+        for i, p in enumerate(packages, start=1)
+    )
+
+
+def render_packages_within_budget(packages: List[Optional[Dict[str, Any]]], budget: int = SUMMARY_PACKAGES_TOKEN_BUDGET) -> str:
+    """Project packages and shrink the hotel lists until the rendering fits the token budget."""
+    for max_hotels in (3, 2, 1, 0):
+        rendered = _render_packages(packages, max_hotels)
+        if count_tokens(rendered) <= budget:
+            return rendered
+    return truncate_to_tokens(rendered, budget)
+
+
+def summary_prompt(packages: List[Dict[str, Any]]):
+    count = len(packages)
+    packages_text = render_packages_within_budget(packages)
     return f"""
     You are a helpful travel assistant.
-    Based on the following 3 flight+hotel package options, provide a concise, friendly summary and recommendation.
+    Based on the following {count} flight+hotel package option{'s' if count != 1 else ''}, provide a concise, friendly summary and recommendation.
     Make it brief and conversational, as strings only (no markdown or emojis).
 
-    Package1 offers:
-    {json.dumps(package1, indent=2)}
-
-    Package2 offers:
-    {json.dumps(package2, indent=2)}
-
-    Package3 offers:
-    {json.dumps(package3, indent=2)}
+    {packages_text}
 
     Please provide:
     1. A short, enthusiastic summary of the available packages.
@@ -26,7 +99,7 @@ def summary_prompt(package1, package2, package3):
     4. Any helpful travel tips or considerations (e.g., layovers, cancellation policies, hidden fees).
 
     Keep it conversational and helpful.
-    Start with something like: "Great! I found 3 exciting packages for your trip..."
+    Start with something like: "Great! I found {count} exciting package{'s' if count != 1 else ''} for your trip..."
 
     Answer must be plain text (not JSON).
     """
\ No newline at end of file
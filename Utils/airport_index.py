@@ -0,0 +1,143 @@
+import csv
+import heapq
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set
+from Utils.fuzzy import edit_distance, normalize_text, trigrams
+
+AIRPORTS_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Data", "airports.csv")
+
+# Words users add around a place name that carry no signal for matching
+_NOISE_WORDS = {"airport", "international", "intl", "the", "city", "of"}
+# Fuzzy matching: shortest key tried, keys short enough that a one-letter substitution is more likely
+# another place ("Gaza"/"Giza", "Ajman"/"Amman") than a typo, and the minimum trigram similarity
+FUZZY_MIN_LENGTH = 5
+FUZZY_SHORT_LENGTH = 6
+FUZZY_MIN_SIMILARITY = 0.2
+
+_airport_index = None
+
+
+class AirportIndex:
+    """In-memory index of city/airport names -> IATA code with exact, alias and fuzzy lookup."""
+
+    def __init__(self, rows: Iterable[Dict[str, str]]):
+        self._codes: Set[str] = set()
+        self._names: Dict[str, str] = {}
+        self._trigram_index: Dict[str, Set[str]] = defaultdict(set)
+        self._trigram_counts: Dict[str, int] = {}
+        self._stats = {"exact": 0, "fuzzy": 0, "misses": 0, "learned": 0}
+
+        for row in rows:
+            code = row["iata"].strip().upper()
+            self._codes.add(code)
+            city = row.get("city", "")
+            country = row.get("country", "")
+            names = [city, f"{city} {country}"]
+            names.extend(alias for alias in (row.get("aliases") or "").split("|") if alias)
+            for name in names:
+                self._add_name(name, code)
+            # Codes only match exactly: "Aden" is not a typo of DEN
+            self._add_name(code, code, fuzzy=False)
+
+    @classmethod
+    def from_csv(cls, path: str = AIRPORTS_CSV) -> "AirportIndex":
+        with open(path, newline="", encoding="utf-8") as f:
+            return cls(csv.DictReader(f))
+
+    @staticmethod
+    def _key(location: str) -> str:
+        words = normalize_text(location).split()
+        return " ".join(w for w in words if w not in _NOISE_WORDS) or " ".join(words)
+
+    def _add_name(self, name: str, code: str, fuzzy: bool = True) -> None:
+        key = self._key(name)
+        if not key or key in self._names:
+            # First entry wins so a city's main airport keeps its plain name
+            return
+        self._names[key] = code
+        if not fuzzy:
+            return
+        grams = trigrams(key)
+        self._trigram_counts[key] = len(grams)
+        for gram in grams:
+            self._trigram_index[gram].add(key)
+
+    def is_airport_code(self, code: str) -> bool:
+        return code.strip().upper() in self._codes
+
+    def lookup_exact(self, location: str) -> Optional[str]:
+        key = self._key(location)
+        if key in self._names:
+            return self._names[key]
+        # "Paris, France" / "Cairo - Egypt": fall back to the part before the separator
+        for separator in (",", " - ", "("):
+            if separator in location:
+                head = self._key(location.split(separator, 1)[0])
+                if head in self._names:
+                    return self._names[head]
+        return None
+
+    def lookup_fuzzy(self, location: str, max_candidates: int = 8) -> Optional[str]:
+        key = self._key(location)
+        if len(key) < FUZZY_MIN_LENGTH:
+            # Too short to tell a typo from a different place ("Bern", "Cork")
+            return None
+        grams = trigrams(key)
+        overlap: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for name in self._trigram_index.get(gram, ()):
+                overlap[name] += 1
+
+        # Rank by trigram Jaccard similarity, then confirm the best few with edit distance
+        def similarity(name):
+            return overlap[name] / (len(grams) + self._trigram_counts[name] - overlap[name])
+
+        candidates = heapq.nlargest(max_candidates, overlap, key=similarity)
+
+        max_distance = max(1, len(key) // 4)
+        best_name, best_distance = None, max_distance + 1
+        for name in candidates:
+            if similarity(name) < FUZZY_MIN_SIMILARITY:
+                break
+            if len(key) <= FUZZY_SHORT_LENGTH and len(name) == len(key) and sorted(name) != sorted(key):
+                # Short keys allow a missing, extra or swapped letter, not a different one
+                continue
+            distance = edit_distance(key, name, max_distance)
+            if distance < best_distance:
+                best_name, best_distance = name, distance
+        return self._names[best_name] if best_name else None
+
+    def resolve(self, location: str) -> Optional[str]:
+        """Resolve a free-text location to an IATA code, or None if the index can't place it."""
+        if not location or not location.strip():
+            return None
+        code = self.lookup_exact(location)
+        if code:
+            self._stats["exact"] += 1
+            return code
+        code = self.lookup_fuzzy(location)
+        if code:
+            self._stats["fuzzy"] += 1
+            return code
+        self._stats["misses"] += 1
+        return None
+
+    def remember(self, location: str, code: str) -> None:
+        """Memoize an externally resolved location (e.g. an LLM answer) into the index."""
+        code = code.strip().upper()
+        self._codes.add(code)
+        if self._key(location) not in self._names:
+            self._stats["learned"] += 1
+        self._add_name(location, code)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self._stats, "names": len(self._names), "codes": len(self._codes)}
+
+
+def get_airport_index() -> AirportIndex:
+    """Returns the process-wide airport index, loading the bundled dataset on first use."""
+    global _airport_index
+    if _airport_index is None:
+        _airport_index = AirportIndex.from_csv()
+    return _airport_index
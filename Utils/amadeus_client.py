@@ -0,0 +1,23 @@
+from typing import Any
+import httpx
+from Utils.amadeus_scheduler import amadeus_scheduler
+from Utils.amadeus_token import AMADEUS_BASE_URL, amadeus_token_provider
+from Utils.http_client import upstream_request
+
+
+async def amadeus_request(method: str, path: str, **kwargs: Any) -> httpx.Response:
+    """
+    Call an Amadeus endpoint with the shared bearer token.
+    A 401 invalidates the cached token and retries once with a fresh one.
+    Every attempt (retries included) waits for a slot from the shared rate-limit scheduler.
+    """
+    url = f"{AMADEUS_BASE_URL}{path}"
+    kwargs["admit"] = lambda: amadeus_scheduler.acquire(path)
+    token = await amadeus_token_provider.get_token()
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    response = await upstream_request(method, url, headers=headers, **kwargs)
+    if response.status_code == 401:
+        token = await amadeus_token_provider.invalidate(token)
+        headers["Authorization"] = f"Bearer {token}"
+        response = await upstream_request(method, url, headers=headers, **kwargs)
+    return response
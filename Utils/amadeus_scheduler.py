@@ -0,0 +1,144 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Priorities: lower runs first
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Per-endpoint quotas in requests/second; Amadeus Self-Service allows 10 TPS in test (40 in production)
+AMADEUS_DEFAULT_TPS = float(os.getenv("AMADEUS_DEFAULT_TPS", "10"))
+AMADEUS_BURST = int(os.getenv("AMADEUS_BURST", "5"))
+ENDPOINT_QUOTAS = {
+    # name: (path prefix, requests/second)
+    "flight_offers": ("/v2/shopping/flight-offers", float(os.getenv("AMADEUS_FLIGHT_OFFERS_TPS", str(AMADEUS_DEFAULT_TPS)))),
+    "hotel_offers": ("/v3/shopping/hotel-offers", float(os.getenv("AMADEUS_HOTEL_OFFERS_TPS", str(AMADEUS_DEFAULT_TPS)))),
+    "hotel_list": ("/v1/reference-data/locations/hotels", float(os.getenv("AMADEUS_HOTEL_LIST_TPS", str(AMADEUS_DEFAULT_TPS)))),
+}
+
+# Who the current task is calling on behalf of; copied into every task the graph spawns
+_request_owner: contextvars.ContextVar[str] = contextvars.ContextVar("amadeus_request_owner", default="")
+_request_priority: contextvars.ContextVar[int] = contextvars.ContextVar("amadeus_request_priority", default=INTERACTIVE)
+_sequence = itertools.count()
+
+
+def set_request_context(owner: str, priority: int = INTERACTIVE) -> None:
+    """Tag Amadeus calls made from the current task (and tasks it spawns) with an owner and priority."""
+    _request_owner.set(owner or "")
+    _request_priority.set(priority)
+
+
+class _EndpointQueue:
+    """Token bucket plus a waiting queue ordered by (priority, fair-share tag, arrival)."""
+
+    def __init__(self, name: str, rate: float, burst: int):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.waiters: List[Tuple[int, float, int, asyncio.Future, float]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        # Start-time fair queueing: each owner's next tag, and the tag of the last dispatched call
+        self.owner_tags: Dict[Tuple[int, str], float] = {}
+        self.virtual_time = 0.0
+        self.stats = {"dispatched": 0, "queued": 0, "max_depth": 0, "wait_total": 0.0, "wait_max": 0.0}
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def enqueue(self, owner: str, priority: int) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (priority, owner)
+        tag = max(self.virtual_time, self.owner_tags.get(key, 0.0)) + 1.0
+        self.owner_tags[key] = tag
+        heapq.heappush(self.waiters, (priority, tag, next(_sequence), future, time.monotonic()))
+        self.stats["queued"] += 1
+        self.stats["max_depth"] = max(self.stats["max_depth"], len(self.waiters))
+        if self.timer is None:
+            # Otherwise the bucket is empty and the pending timer will dispatch in order
+            self.pump()
+        return future
+
+    def pump(self) -> None:
+        self.timer = None
+        now = time.monotonic()
+        self._refill(now)
+        while self.waiters:
+            priority, tag, _, future, queued_at = self.waiters[0]
+            if future.done():
+                # Caller gave up (cancelled) while queued; it doesn't consume a token
+                heapq.heappop(self.waiters)
+                continue
+            if self.tokens < 1:
+                break
+            heapq.heappop(self.waiters)
+            self.tokens -= 1
+            self.virtual_time = max(self.virtual_time, tag - 1.0)
+            waited = now - queued_at
+            self.stats["dispatched"] += 1
+            self.stats["wait_total"] += waited
+            self.stats["wait_max"] = max(self.stats["wait_max"], waited)
+            future.set_result(waited)
+        if self.waiters and self.timer is None:
+            delay = (1 - self.tokens) / self.rate if self.rate > 0 else 1.0
+            self.timer = asyncio.get_running_loop().call_later(max(delay, 0.001), self.pump)
+        if len(self.owner_tags) > 1000:
+            # Forget owners that are no longer ahead of the virtual clock
+            self.owner_tags = {k: t for k, t in self.owner_tags.items() if t > self.virtual_time}
+
+    def get_stats(self) -> Dict[str, Any]:
+        dispatched = self.stats["dispatched"]
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "queue_depth": sum(1 for w in self.waiters if not w[3].done()),
+            "max_queue_depth": self.stats["max_depth"],
+            "queued": self.stats["queued"],
+            "dispatched": dispatched,
+            "avg_wait_ms": round(1000 * self.stats["wait_total"] / dispatched, 2) if dispatched else 0.0,
+            "max_wait_ms": round(1000 * self.stats["wait_max"], 2),
+        }
+
+
+class AmadeusScheduler:
+    """
+    Process-wide admission control for Amadeus calls.
+    Each endpoint has a token bucket sized to its quota; callers wait in a queue where interactive
+    searches go before background work and concurrent threads are served round-robin.
+    """
+
+    def __init__(self, quotas: Dict[str, Tuple[str, float]], default_rate: float, burst: int):
+        self.prefixes = [(prefix, name) for name, (prefix, _) in quotas.items()]
+        self.queues = {name: _EndpointQueue(name, rate, burst) for name, (_, rate) in quotas.items()}
+        self.queues["other"] = _EndpointQueue("other", default_rate, burst)
+
+    def endpoint_for(self, path: str) -> str:
+        for prefix, name in self.prefixes:
+            if path.startswith(prefix):
+                return name
+        return "other"
+
+    async def acquire(self, path: str) -> float:
+        """Wait for a slot on the endpoint's bucket; returns the seconds spent queued."""
+        queue = self.queues[self.endpoint_for(path)]
+        future = queue.enqueue(_request_owner.get(), _request_priority.get())
+        try:
+            return await future
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth, wait time and dispatch counters per endpoint."""
+        return {name: queue.get_stats() for name, queue in self.queues.items()}
+
+
+# Global scheduler instance
+amadeus_scheduler = AmadeusScheduler(ENDPOINT_QUOTAS, AMADEUS_DEFAULT_TPS, AMADEUS_BURST)
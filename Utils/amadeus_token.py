@@ -0,0 +1,88 @@
+import asyncio
+import os
+import time
+from typing import Optional
+from dotenv import load_dotenv
+from Utils.http_client import upstream_request
+
+load_dotenv()
+
+AMADEUS_BASE_URL = os.getenv("AMADEUS_BASE_URL", "https://test.api.amadeus.com")
+TOKEN_URL = f"{AMADEUS_BASE_URL}/v1/security/oauth2/token"
+
+# Treat the token as expired this many seconds before Amadeus does, so requests
+# in flight never carry a token that dies mid-call.
+REFRESH_MARGIN_SECONDS = 120
+
+
+class AmadeusTokenProvider:
+    """Process-wide Amadeus OAuth token cache with single-flight, proactive refresh."""
+
+    def __init__(self, refresh_margin: float = REFRESH_MARGIN_SECONDS):
+        self._refresh_margin = refresh_margin
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def _is_fresh(self) -> bool:
+        return self._token is not None and time.monotonic() < self._expires_at - self._refresh_margin
+
+    async def get_token(self) -> str:
+        """Return a valid access token, fetching one only when the cached token is near expiry."""
+        if self._is_fresh():
+            return self._token
+        return await self._refresh(stale_token=self._token)
+
+    async def invalidate(self, token: Optional[str]) -> str:
+        """Drop a token the API rejected (401) and return a replacement."""
+        return await self._refresh(stale_token=token, force=True)
+
+    async def _refresh(self, stale_token: Optional[str], force: bool = False) -> str:
+        async with self._lock:
+            # Another coroutine may have refreshed while we were waiting on the lock
+            if self._is_fresh() and (not force or self._token != stale_token):
+                return self._token
+
+            data = {
+                "grant_type": "client_credentials",
+                "client_id": os.getenv("AMADEUS_CLIENT_ID"),
+                "client_secret": os.getenv("AMADEUS_CLIENT_SECRET")
+            }
+            headers = {"Content-Type": "application/x-www-form-urlencoded"}
+            response = await upstream_request("POST", TOKEN_URL, headers=headers, data=data)
+            response.raise_for_status()
+            token_json = response.json()
+
+            self._token = token_json.get("access_token")
+            expires_in = float(token_json.get("expires_in", 1799))
+            self._expires_at = time.monotonic() + expires_in
+            print(f"AmadeusTokenProvider: acquired access token (expires in {int(expires_in)}s)")
+
+            self._schedule_background_refresh(expires_in)
+            return self._token
+
+    def _schedule_background_refresh(self, expires_in: float) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            if self._refresh_task is not asyncio.current_task():
+                self._refresh_task.cancel()
+        delay = max(expires_in - self._refresh_margin - 30, 1)
+        self._refresh_task = asyncio.get_running_loop().create_task(self._refresh_later(delay))
+
+    async def _refresh_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        try:
+            await self._refresh(stale_token=self._token, force=True)
+        except Exception as e:
+            # Foreground callers will retry once the cached token goes stale
+            print(f"AmadeusTokenProvider: background refresh failed: {e}")
+
+    async def close(self) -> None:
+        """Cancel the pending background refresh (called on application shutdown)."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+
+# Global token provider instance
+amadeus_token_provider = AmadeusTokenProvider()
@@ -0,0 +1,105 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Optional
+from Utils.fuzzy import edit_distance
+
+# Cabin codes accepted by the Amadeus flight-offers search
+CABIN_CODES = ("ECONOMY", "PREMIUM_ECONOMY", "BUSINESS", "FIRST")
+
+_CABIN_SYNONYMS = {
+    "PREMIUM_ECONOMY": [
+        "premium economy", "premium eco", "premium", "prem eco", "economy plus", "eco plus",
+        "economy comfort", "comfort plus", "extra legroom", "premium economique", "premium economica",
+        "premium economy class", "w",
+    ],
+    "ECONOMY": [
+        "economy", "eco", "econ", "economic", "coach", "standard", "main cabin", "basic", "cheapest",
+        "economique", "touriste", "turista", "economica", "turistica", "economy class",
+        "y", "اقتصادي", "اقتصادية", "سياحي", "سياحية",
+    ],
+    "BUSINESS": [
+        "business", "biz", "busines", "bussiness", "buisness", "club", "club world", "upper class",
+        "executive", "affaires", "ejecutiva", "negocios", "business class", "j", "c",
+        "بيزنس", "رجال الاعمال", "رجال أعمال", "الاعمال",
+    ],
+    "FIRST": [
+        "first", "first class", "1st", "1st class", "premiere", "la premiere", "primera", "prima",
+        "prima classe", "erste", "f", "الاولى", "الأولى", "اولى", "أولى",
+    ],
+}
+
+# Words that surround a cabin name without changing it ("business class seat please")
+_FILLER_WORDS = {
+    "class", "cabin", "seat", "seats", "please", "in", "fly", "flying", "the", "a", "classe", "clase",
+    "klasse", "درجة", "الدرجة", "ال",
+}
+
+# Normalized synonym -> cabin code, built once at import
+_SYNONYM_TABLE: Dict[str, str] = {}
+# Learned answers (e.g. from the LLM fallback) for inputs the table could not place
+_learned: Dict[str, str] = {}
+
+
+def _key(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    words = re.sub(r"[^\w ]+", " ", text.lower().replace("_", " ")).split()
+    return " ".join(w for w in words if w not in _FILLER_WORDS) or " ".join(words)
+
+
+for _code, _synonyms in _CABIN_SYNONYMS.items():
+    _SYNONYM_TABLE.setdefault(_key(_code), _code)
+    for _synonym in _synonyms:
+        _SYNONYM_TABLE.setdefault(_key(_synonym), _code)
+_SYNONYM_TABLE.setdefault(_key("FIRST_CLASS"), "FIRST")
+
+
+@lru_cache(maxsize=1024)
+def lookup_cabin_class(cabin: str) -> Optional[str]:
+    """
+    Map free text ("eco", "biz", "Première", "buisness class") to an Amadeus cabin code.
+    Returns None when the table can't place the input, so callers can decide on a fallback.
+    """
+    if not cabin or not cabin.strip():
+        return None
+    key = _key(cabin)
+    if key in _SYNONYM_TABLE:
+        return _SYNONYM_TABLE[key]
+    if key in _learned:
+        return _learned[key]
+
+    # Phrase containment, most specific cabin first ("premium economy seat" before "economy")
+    words = f" {key} "
+    for code in ("PREMIUM_ECONOMY", "FIRST", "BUSINESS", "ECONOMY"):
+        for synonym in _CABIN_SYNONYMS[code]:
+            synonym_key = _key(synonym)
+            if len(synonym_key) > 2 and f" {synonym_key} " in words:
+                return code
+
+    # Typo tolerance for anything long enough to be a misspelling rather than a code letter
+    if len(key) >= 4:
+        max_distance = max(1, len(key) // 4)
+        best_code, best_distance = None, max_distance + 1
+        for synonym_key, code in _SYNONYM_TABLE.items():
+            if len(synonym_key) < 4:
+                continue
+            distance = edit_distance(key, synonym_key, max_distance)
+            if distance < best_distance:
+                best_code, best_distance = code, distance
+        return best_code
+    return None
+
+
+def exact_cabin_class(cabin: str) -> Optional[str]:
+    """Strict variant of lookup_cabin_class: only exact synonym-table matches, no containment or typos."""
+    if not cabin or not cabin.strip():
+        return None
+    return _SYNONYM_TABLE.get(_key(cabin))
+
+
+def remember_cabin_class(cabin: str, code: str) -> None:
+    """Memoize a fallback answer so the same input never needs the fallback again."""
+    if code in CABIN_CODES:
+        _learned[_key(cabin)] = code
+        lookup_cabin_class.cache_clear()
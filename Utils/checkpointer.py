@@ -0,0 +1,89 @@
+import asyncio
+import os
+
+_checkpointer = None
+_checkpoint_conn = None
+# Event loop the checkpointer was created on; evict hooks fired from store worker threads hop back to it
+_checkpoint_loop = None
+# Background checkpoint deletions, referenced until they finish
+_pending_deletes = set()
+
+
+async def create_checkpointer():
+    """
+    Build the LangGraph checkpointer selected by GRAPH_CHECKPOINTER.
+    "memory" keeps per-thread state in this process; "sqlite" persists it to GRAPH_CHECKPOINT_PATH
+    so it survives restarts and is shared by workers on the same host.
+    Defaults to the conversation store's backend: the extraction prompt only carries the last few
+    messages, so a conversation shared across workers needs its slots shared too.
+    """
+    global _checkpointer, _checkpoint_conn, _checkpoint_loop
+    if _checkpointer is not None:
+        return _checkpointer
+    _checkpoint_loop = asyncio.get_running_loop()
+
+    store_backend = os.getenv("CONVERSATION_STORE_BACKEND", "memory").lower()
+    backend = os.getenv("GRAPH_CHECKPOINTER", store_backend).lower()
+    if store_backend == "sqlite" and backend != "sqlite":
+        raise RuntimeError(
+            "GRAPH_CHECKPOINTER=memory with CONVERSATION_STORE_BACKEND=sqlite loses slots from earlier turns "
+            "when a turn lands on another worker or after a restart; use GRAPH_CHECKPOINTER=sqlite"
+        )
+    if backend == "sqlite":
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        _checkpoint_conn = await aiosqlite.connect(os.getenv("GRAPH_CHECKPOINT_PATH", "checkpoints.sqlite3"))
+        await _checkpoint_conn.execute("PRAGMA journal_mode=WAL")
+        _checkpointer = AsyncSqliteSaver(_checkpoint_conn)
+        await _checkpointer.setup()
+    else:
+        from langgraph.checkpoint.memory import MemorySaver
+
+        _checkpointer = MemorySaver()
+    return _checkpointer
+
+
+async def delete_thread_checkpoints(thread_id: str) -> None:
+    """Forget all saved graph state for a thread (used by /api/reset)."""
+    if _checkpointer is not None:
+        await _checkpointer.adelete_thread(thread_id)
+
+
+def forget_thread_checkpoints(thread_id: str) -> None:
+    """
+    Conversation-store evict hook: drop the checkpoints of a thread that was evicted or expired.
+    Without it the in-memory saver keeps every thread's graph state for the life of the process.
+    """
+    if _checkpointer is None:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Called from a conversation-store worker thread
+        if _checkpoint_loop is not None and not _checkpoint_loop.is_closed():
+            _checkpoint_loop.call_soon_threadsafe(forget_thread_checkpoints, thread_id)
+        return
+    if _checkpoint_conn is None:
+        # In-memory saver: deleting is a plain dict operation
+        _checkpointer.delete_thread(thread_id)
+        return
+    task = loop.create_task(_delete_quietly(thread_id))
+    _pending_deletes.add(task)
+    task.add_done_callback(_pending_deletes.discard)
+
+
+async def _delete_quietly(thread_id: str) -> None:
+    try:
+        await delete_thread_checkpoints(thread_id)
+    except Exception as e:
+        print(f"Checkpointer: deleting checkpoints for {thread_id} failed: {e}")
+
+
+async def close_checkpointer() -> None:
+    """Close the checkpoint database connection (called on application shutdown)."""
+    global _checkpointer, _checkpoint_conn
+    if _checkpoint_conn is not None:
+        await _checkpoint_conn.close()
+    _checkpointer = None
+    _checkpoint_conn = None
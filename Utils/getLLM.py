@@ -1,15 +1,141 @@
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
+from langchain_core.messages import AIMessage, BaseMessage
+from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
+import json
 import os
+import sqlite3
+import threading
+import time
 
 load_dotenv()
 
 _llm_json = None
 _llm_text = None
+_llm_cache = None
 
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+# A hit only rewrites last_access once it is this stale (seconds); eviction order doesn't need more
+_ACCESS_TIME_RESOLUTION = 60
 
-def get_llm_json() -> ChatOpenAI:
-	"""Returns the JSON-mode LLM used for structured extraction."""
+
+class LLMResponseCache:
+	"""Persistent SQLite cache of LLM completions with least-recently-used eviction by total size."""
+
+	def __init__(self, path: str, max_bytes: int):
+		self.max_bytes = max_bytes
+		self._lock = threading.Lock()
+		self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+		self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+		self._db.execute("PRAGMA journal_mode=WAL")
+		# A lost cache write after a power failure is harmless; skip the fsync on every commit
+		self._db.execute("PRAGMA synchronous=NORMAL")
+		self._db.execute(
+			"CREATE TABLE IF NOT EXISTS llm_cache ("
+			"key TEXT PRIMARY KEY, content TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+		)
+		self._db.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+		self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+	def get(self, key: str) -> Optional[str]:
+		with self._lock:
+			row = self._db.execute("SELECT content, last_access FROM llm_cache WHERE key = ?", (key,)).fetchone()
+			if row is None:
+				self._stats["misses"] += 1
+				return None
+			now = time.time()
+			if now - row[1] > _ACCESS_TIME_RESOLUTION:
+				self._db.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+			self._stats["hits"] += 1
+			return row[0]
+
+	def set(self, key: str, content: str) -> None:
+		size = len(content.encode("utf-8")) + len(key)
+		if size > self.max_bytes:
+			return
+		with self._lock:
+			old = self._db.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+			self._db.execute(
+				"INSERT OR REPLACE INTO llm_cache (key, content, size, last_access) VALUES (?, ?, ?, ?)",
+				(key, content, size, time.time()),
+			)
+			self._bytes += size - (old[0] if old else 0)
+			self._stats["writes"] += 1
+			if self._bytes > self.max_bytes:
+				self._evict()
+
+	def _evict(self) -> None:
+		# Trim to 90% of the budget so eviction doesn't run on every write
+		target = int(self.max_bytes * 0.9)
+		rows = self._db.execute("SELECT key, size FROM llm_cache ORDER BY last_access").fetchall()
+		for key, size in rows:
+			if self._bytes <= target:
+				break
+			self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+			self._bytes -= size
+			self._stats["evictions"] += 1
+
+	def get_stats(self) -> Dict[str, Any]:
+		lookups = self._stats["hits"] + self._stats["misses"]
+		return {
+			**self._stats,
+			"bytes": self._bytes,
+			"hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+		}
+
+
+class CachedChatModel:
+	"""
+	Wraps a ChatOpenAI model and serves repeated calls from the response cache.
+	Only use for deterministic prompts; the key covers model, temperature, response format and messages.
+	"""
+
+	def __init__(self, llm: ChatOpenAI, cache: LLMResponseCache):
+		self.llm = llm
+		self.cache = cache
+
+	def _key(self, messages: List[BaseMessage]) -> str:
+		payload = {
+			"model": self.llm.model_name,
+			"temperature": self.llm.temperature,
+			"response_format": (self.llm.model_kwargs or {}).get("response_format") or getattr(self.llm, "response_format", None),
+			"messages": [[m.type, " ".join(str(m.content).split())] for m in messages],
+		}
+		return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+	def invoke(self, messages: List[BaseMessage], *args: Any, **kwargs: Any) -> AIMessage:
+		key = self._key(messages)
+		content = self.cache.get(key)
+		if content is not None:
+			return AIMessage(content=content)
+		response = self.llm.invoke(messages, *args, **kwargs)
+		self.cache.set(key, response.content)
+		return response
+
+	async def ainvoke(self, messages: List[BaseMessage], *args: Any, **kwargs: Any) -> AIMessage:
+		key = self._key(messages)
+		# Cache I/O is SQLite on disk: keep it off the event loop
+		content = await asyncio.to_thread(self.cache.get, key)
+		if content is not None:
+			return AIMessage(content=content)
+		response = await self.llm.ainvoke(messages, *args, **kwargs)
+		await asyncio.to_thread(self.cache.set, key, response.content)
+		return response
+
+
+def get_llm_cache() -> LLMResponseCache:
+	"""Returns the process-wide LLM response cache."""
+	global _llm_cache
+	if _llm_cache is None:
+		_llm_cache = LLMResponseCache(LLM_CACHE_PATH, LLM_CACHE_MAX_BYTES)
+	return _llm_cache
+
+
+def get_llm_json(cache: bool = False):
+	"""Returns the JSON-mode LLM used for structured extraction (response-cached if cache=True)."""
 	global _llm_json
 	if _llm_json is None:
 		api_key = os.getenv("OPENAI_API_KEY")
@@ -21,11 +147,14 @@ def get_llm_json() -> ChatOpenAI:
 			api_key=api_key,
 			response_format={"type": "json_object"},
 		)
-	return _llm_json
+	return CachedChatModel(_llm_json, get_llm_cache()) if cache else _llm_json
 
 
-def get_text_llm() -> ChatOpenAI:
-	"""Returns a text-mode LLM for natural language responses (no JSON forcing)."""
+def get_text_llm(cache: bool = False):
+	"""
+	Returns a text-mode LLM for natural language responses (no JSON forcing).
+	Pass cache=True only for deterministic prompts; open-ended text such as the package summary should not be cached.
+	"""
 	global _llm_text
 	if _llm_text is None:
 		api_key = os.getenv("OPENAI_API_KEY")
@@ -36,7 +165,7 @@ def get_text_llm() -> ChatOpenAI:
 			temperature=0.2,
 			api_key=api_key,
 		)
-	return _llm_text
+	return CachedChatModel(_llm_text, get_llm_cache()) if cache else _llm_text
 
 
 def get_llm() -> ChatOpenAI:
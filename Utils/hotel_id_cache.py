@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from Utils.amadeus_scheduler import BACKGROUND, set_request_context
+
+HOTEL_ID_CACHE_TTL = float(os.getenv("HOTEL_ID_CACHE_TTL", str(24 * 3600)))
+HOTEL_ID_CACHE_MAX_STALE = float(os.getenv("HOTEL_ID_CACHE_MAX_STALE", str(7 * 24 * 3600)))
+HOTEL_ID_CACHE_PATH = os.getenv("HOTEL_ID_CACHE_PATH", "")
+
+
+class HotelIdCache:
+    """
+    Long-lived cache of city code -> hotel IDs with stale-while-revalidate.
+    Entries younger than ttl are served directly; entries up to max_stale old are served
+    immediately while a background refresh runs. Optionally persisted to SQLite.
+    """
+
+    def __init__(self, ttl: float, max_stale: float, path: str = ""):
+        self.ttl = ttl
+        self.max_stale = max(max_stale, ttl)
+        self.path = path
+        self._entries: Dict[str, Tuple[float, List[str]]] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS hotel_ids ("
+                "city_code TEXT PRIMARY KEY, hotel_ids TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def _lookup(self, city_code: str) -> Optional[Tuple[float, List[str]]]:
+        entry = self._entries.get(city_code)
+        if entry is None and self._db is not None:
+            row = self._db.execute(
+                "SELECT fetched_at, hotel_ids FROM hotel_ids WHERE city_code = ?", (city_code,)
+            ).fetchone()
+            if row:
+                entry = (row[0], json.loads(row[1]))
+                self._entries[city_code] = entry
+        return entry
+
+    def _store(self, city_code: str, hotel_ids: List[str]) -> None:
+        fetched_at = time.time()
+        self._entries[city_code] = (fetched_at, hotel_ids)
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO hotel_ids (city_code, hotel_ids, fetched_at) VALUES (?, ?, ?)",
+                (city_code, json.dumps(hotel_ids), fetched_at),
+            )
+            self._db.commit()
+
+    async def get_or_fetch(self, city_code: str, fetch: Callable[[], Awaitable[List[str]]]) -> List[str]:
+        """Return hotel IDs for a city, calling fetch() only on a miss or to revalidate a stale entry."""
+        city_code = city_code.upper()
+        entry = self._lookup(city_code)
+        if entry is not None:
+            fetched_at, hotel_ids = entry
+            age = time.time() - fetched_at
+            if age < self.ttl:
+                self._stats["hits"] += 1
+                return hotel_ids
+            if age < self.max_stale:
+                self._stats["stale_hits"] += 1
+                self._refresh(city_code, fetch, background=True)
+                return hotel_ids
+
+        self._stats["misses"] += 1
+        # Concurrent misses for the same city share one upstream lookup
+        return await asyncio.shield(self._refresh(city_code, fetch))
+
+    def _refresh(self, city_code: str, fetch: Callable[[], Awaitable[List[str]]], background: bool = False) -> asyncio.Task:
+        task = self._refreshing.get(city_code)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._run_refresh(city_code, fetch, background))
+            task.add_done_callback(_consume_refresh_error)
+            self._refreshing[city_code] = task
+        return task
+
+    async def _run_refresh(self, city_code: str, fetch: Callable[[], Awaitable[List[str]]], background: bool = False) -> List[str]:
+        if background:
+            # Nobody is waiting on a revalidation: let interactive searches go first
+            set_request_context("hotel-id-refresh", BACKGROUND)
+        try:
+            self._stats["refreshes"] += 1
+            hotel_ids = await fetch()
+            if hotel_ids:
+                self._store(city_code, hotel_ids)
+            return hotel_ids
+        except Exception as e:
+            self._stats["refresh_errors"] += 1
+            print(f"HotelIdCache: refresh for {city_code} failed: {e}")
+            raise
+        finally:
+            self._refreshing.pop(city_code, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Returns hit/stale/miss/refresh counters plus the number of cached cities."""
+        return {**self._stats, "entries": len(self._entries)}
+
+
+def _consume_refresh_error(task: asyncio.Task) -> None:
+    # Background refreshes have no awaiter; mark their errors as handled (already logged)
+    if not task.cancelled():
+        task.exception()
+
+
+# Global hotel-ID cache instance
+hotel_id_cache = HotelIdCache(HOTEL_ID_CACHE_TTL, HOTEL_ID_CACHE_MAX_STALE, HOTEL_ID_CACHE_PATH)
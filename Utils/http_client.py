@@ -0,0 +1,120 @@
+import asyncio
+import os
+import random
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+# Connection pool / timeout policy for upstream APIs (overridable via env)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "20"))
+
+# Retry policy: jittered exponential backoff on throttling and server errors
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.25"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "4"))
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_async_client = None
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+_stats = {
+    "requests": 0,
+    "retries": 0,
+    "failures": 0,
+    "new_connections": 0,
+    "reused_connections": 0,
+}
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Returns the shared non-blocking HTTP client used for all upstream calls."""
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                connect=HTTP_CONNECT_TIMEOUT,
+                read=HTTP_READ_TIMEOUT,
+                write=HTTP_READ_TIMEOUT,
+                pool=HTTP_CONNECT_TIMEOUT,
+            ),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=60,
+            ),
+        )
+    return _async_client
+
+
+async def close_async_client() -> None:
+    """Closes the shared HTTP client (called on application shutdown)."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc
+    if host not in _host_semaphores:
+        _host_semaphores[host] = asyncio.Semaphore(HTTP_MAX_PER_HOST)
+    return _host_semaphores[host]
+
+
+def _backoff_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Full-jitter exponential backoff, honouring a numeric Retry-After header when present."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), HTTP_BACKOFF_MAX)
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+
+async def upstream_request(
+    method: str, url: str, admit: Optional[Callable[[], Awaitable[Any]]] = None, **kwargs: Any
+) -> httpx.Response:
+    """
+    Send a request through the shared pool with per-host caps and retries.
+    Retries 429/5xx responses and transport errors; other responses are returned as-is.
+    `admit`, if given, is awaited before every attempt (e.g. a rate limiter slot).
+    """
+    client = get_async_client()
+    semaphore = _host_semaphore(url)
+
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        opened = []
+
+        async def trace(event_name, info):
+            # httpcore emits connect_tcp only when the pool had no idle connection to reuse
+            if event_name == "connection.connect_tcp.complete":
+                opened.append(True)
+
+        if admit is not None:
+            await admit()
+        _stats["requests"] += 1
+        response = None
+        try:
+            async with semaphore:
+                response = await client.request(method, url, extensions={"trace": trace}, **kwargs)
+        except httpx.TransportError as e:
+            if attempt == HTTP_MAX_RETRIES:
+                _stats["failures"] += 1
+                raise
+            print(f"upstream_request: {method} {url} failed ({e!r}), retrying")
+        else:
+            _stats["new_connections" if opened else "reused_connections"] += 1
+            if response.status_code not in RETRY_STATUS_CODES or attempt == HTTP_MAX_RETRIES:
+                return response
+            print(f"upstream_request: {method} {url} returned {response.status_code}, retrying")
+
+        _stats["retries"] += 1
+        await asyncio.sleep(_backoff_delay(attempt, response))
+
+
+def get_upstream_stats() -> Dict[str, int]:
+    """Returns counters for upstream requests, retries and connection reuse."""
+    return dict(_stats)
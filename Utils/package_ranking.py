@@ -0,0 +1,189 @@
+import heapq
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Score weights (lower score is better); price and duration are relative to the best candidate
+RANK_WEIGHT_PRICE = float(os.getenv("RANK_WEIGHT_PRICE", "1.0"))
+RANK_WEIGHT_STOPS = float(os.getenv("RANK_WEIGHT_STOPS", "0.15"))
+RANK_WEIGHT_DURATION = float(os.getenv("RANK_WEIGHT_DURATION", "0.3"))
+RANK_WEIGHT_RATING = float(os.getenv("RANK_WEIGHT_RATING", "0.2"))
+# Packages returned, and how many of them may share one flight (with different hotels)
+RANK_TOP_K = int(os.getenv("RANK_TOP_K", "3"))
+RANK_MAX_PER_FLIGHT = int(os.getenv("RANK_MAX_PER_FLIGHT", "1"))
+
+_DURATION_RE = re.compile(r"PT(?:(\d+)H)?(?:(\d+)M)?")
+
+
+def iso_duration_hours(value: Optional[str]) -> float:
+    """'PT6H15M' -> 6.25 (0 when missing or unparseable)."""
+    match = _DURATION_RE.fullmatch(value or "")
+    if not match:
+        return 0.0
+    return int(match.group(1) or 0) + int(match.group(2) or 0) / 60
+
+
+def flight_features(flight: Dict[str, Any]) -> Dict[str, float]:
+    itineraries = flight.get("itineraries", [])
+    return {
+        "price": float(flight.get("price", {}).get("total", 0) or 0),
+        "stops": float(sum(max(len(it.get("segments", [])) - 1, 0) for it in itineraries)),
+        "hours": sum(iso_duration_hours(it.get("duration")) for it in itineraries),
+    }
+
+
+def hotel_features(hotel_info: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    """Cheapest-offer price and star rating of a processed hotel; None if it has nothing bookable."""
+    if not hotel_info.get("available", True) or not hotel_info.get("best_offers"):
+        return None
+    price = hotel_info["best_offers"][0]["offer"].get("price", {}).get("total")
+    if price is None:
+        return None
+    rating = str(hotel_info.get("hotel", {}).get("rating") or "")
+    return {"price": float(price), "rating": float(rating) if rating.isdigit() else 0.0}
+
+
+def _first_hotel_price(hotels: List[Dict[str, Any]]) -> Optional[float]:
+    # Hotel lists arrive cheapest first (process_hotel_offers), so the first bookable is the minimum
+    for hotel_info in hotels:
+        features = hotel_features(hotel_info)
+        if features is not None:
+            return features["price"]
+    return None
+
+
+def _best_hotels(hotels: List[Dict[str, Any]], n: int, score, price_weight: float) -> List[Tuple]:
+    """
+    The n best-scoring hotels as (score, index, features, hotel), best first.
+    Scores are at least price_weight * price, so on a cheapest-first list the scan stops as soon as
+    that lower bound passes the n-th best score; unsorted input is simply scanned in full.
+    """
+    best: List[Tuple] = []  # max-heap of the n best via negated scores
+    previous_price = float("-inf")
+    in_order = True
+    for i, hotel_info in enumerate(hotels):
+        features = hotel_features(hotel_info)
+        if features is None:
+            continue
+        price = features["price"]
+        in_order = in_order and price >= previous_price
+        previous_price = price
+        if len(best) == n and in_order and price_weight * price > -best[0][0]:
+            break
+        entry = (-score(features), -i, features, hotel_info)
+        if len(best) < n:
+            heapq.heappush(best, entry)
+        elif entry > best[0]:
+            heapq.heapreplace(best, entry)
+    return [(-neg, -neg_i, features, info) for neg, neg_i, features, info in sorted(best, reverse=True)]
+
+
+class _Candidates:
+    """One departure date's best flights and hotels, each sorted by its separable share of the score."""
+
+    def __init__(self, date: str, flights: List[Tuple], hotels: List[Tuple]):
+        self.date = date
+        self.flights = flights
+        self.hotels = hotels
+
+
+def rank_packages(
+    dates: List[str],
+    flights_by_date: Dict[str, List[Dict[str, Any]]],
+    hotels_by_date: Dict[str, List[Dict[str, Any]]],
+    k: int = RANK_TOP_K,
+    max_per_flight: int = RANK_MAX_PER_FLIGHT,
+    hotel_options: int = 5,
+) -> List[Dict[str, Any]]:
+    """
+    Top-k (date, flight, hotel) combinations by weighted score, cheapest/shortest/highest-rated first.
+
+    The score splits into a flight part plus a hotel part, so each date only needs its best k flights
+    and hotels (heap-selected) and the k best sums come from a frontier heap over the sorted pairs,
+    without scoring the full flight x hotel product.
+    Returns dicts with date, flight, hotel, the date's best hotels (ranked) and a score breakdown.
+    """
+    if k <= 0:
+        return []
+    max_per_flight = max(1, max_per_flight)
+
+    raw: Dict[str, Tuple[List, List, Optional[float]]] = {}
+    for date in dates:
+        flights = [(flight_features(f), f) for f in flights_by_date.get(date) or []]
+        hotels = hotels_by_date.get(date) or []
+        if flights:
+            raw[date] = (flights, hotels, _first_hotel_price(hotels))
+    if not raw:
+        return []
+
+    # Flight-only candidates would win on price alone; only rank them if no date has hotels
+    if any(min_hotel is not None for _, _, min_hotel in raw.values()):
+        raw = {date: entry for date, entry in raw.items() if entry[2] is not None}
+
+    # Reference points so weights are unitless: best total price and shortest flight time
+    ref_price = min(
+        min(f["price"] for f, _ in flights) + (min_hotel or 0.0)
+        for flights, _, min_hotel in raw.values()
+    ) or 1.0
+    ref_hours = min(f["hours"] for flights, _, _ in raw.values() for f, _ in flights) or 1.0
+
+    def flight_score(f):
+        return (RANK_WEIGHT_PRICE * f["price"] / ref_price
+                + RANK_WEIGHT_STOPS * f["stops"]
+                + RANK_WEIGHT_DURATION * (f["hours"] / ref_hours - 1))
+
+    def hotel_score(h):
+        return RANK_WEIGHT_PRICE * h["price"] / ref_price + RANK_WEIGHT_RATING * (5 - min(h["rating"], 5)) / 5
+
+    candidates = []
+    for date, (flights, hotels, _) in raw.items():
+        candidates.append(_Candidates(
+            date,
+            heapq.nsmallest(k, ((flight_score(f), i, f, offer) for i, (f, offer) in enumerate(flights)), key=lambda c: (c[0], c[1])),
+            _best_hotels(hotels, max(k, hotel_options), hotel_score, RANK_WEIGHT_PRICE / ref_price)
+            or [(0.0, 0, {"price": 0.0, "rating": 0.0}, None)],
+        ))
+
+    # Frontier over (flight i, hotel j) per date: pop the best sum, then expand (i, j+1) and, from column 0, (i+1, 0)
+    frontier = [(c.flights[0][0] + c.hotels[0][0], n, 0, 0) for n, c in enumerate(candidates)]
+    heapq.heapify(frontier)
+    per_flight: Dict[Tuple[int, int], int] = {}
+    ranked = []
+    while frontier and len(ranked) < k:
+        score, n, i, j = heapq.heappop(frontier)
+        c = candidates[n]
+        if j == 0 and i + 1 < len(c.flights):
+            heapq.heappush(frontier, (c.flights[i + 1][0] + c.hotels[0][0], n, i + 1, 0))
+        used = per_flight.get((n, i), 0)
+        if used >= max_per_flight:
+            continue
+        per_flight[(n, i)] = used + 1
+        if used + 1 < max_per_flight and j + 1 < len(c.hotels):
+            heapq.heappush(frontier, (c.flights[i][0] + c.hotels[j + 1][0], n, i, j + 1))
+
+        _, _, f, flight = c.flights[i]
+        _, _, h, hotel = c.hotels[j]
+        ranked.append({
+            "date": c.date,
+            "flight": flight,
+            "hotel": hotel,
+            # The package's own hotel first, then the date's other best hotels
+            "hotel_options": ([hotel] if hotel is not None else []) + [
+                info for _, _, _, info in c.hotels[:hotel_options] if info is not None and info is not hotel
+            ][:hotel_options - 1],
+            "score": {
+                # Components are 0 for the ideal candidate; total is their sum
+                "total": round(score - RANK_WEIGHT_PRICE, 4),
+                "price": round(RANK_WEIGHT_PRICE * ((f["price"] + h["price"]) / ref_price - 1), 4),
+                "stops": round(RANK_WEIGHT_STOPS * f["stops"], 4),
+                "duration": round(RANK_WEIGHT_DURATION * (f["hours"] / ref_hours - 1), 4),
+                "rating": round(RANK_WEIGHT_RATING * (5 - min(h["rating"], 5)) / 5, 4) if hotel is not None else 0.0,
+            },
+            "features": {
+                "total_price": round(f["price"] + h["price"], 2),
+                "stops": int(f["stops"]),
+                "flight_hours": round(f["hours"], 2),
+                "hotel_rating": h["rating"] or None,
+            },
+        })
+    return ranked
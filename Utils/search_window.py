@@ -0,0 +1,39 @@
+import asyncio
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Iterable, List, Optional
+
+# Default flexible-date window around the requested departure date (days before / after)
+SEARCH_WINDOW_BEFORE = int(os.getenv("SEARCH_WINDOW_BEFORE", "0"))
+SEARCH_WINDOW_AFTER = int(os.getenv("SEARCH_WINDOW_AFTER", "2"))
+# Upper bound on a per-request ±N window
+SEARCH_WINDOW_MAX_DAYS = int(os.getenv("SEARCH_WINDOW_MAX_DAYS", "7"))
+# Max upstream searches in flight at once for one request's fan-out
+SEARCH_MAX_CONCURRENCY = int(os.getenv("SEARCH_MAX_CONCURRENCY", "4"))
+
+
+def search_dates(departure_date: str, flex_days: Optional[int] = None, today: Optional[date] = None) -> List[str]:
+    """
+    Departure dates to search, in order.
+    flex_days=N searches ±N days around the requested date; None uses the configured default window.
+    Dates in the past are skipped.
+    """
+    start = datetime.strptime(departure_date, "%Y-%m-%d").date()
+    if flex_days is None:
+        before, after = SEARCH_WINDOW_BEFORE, SEARCH_WINDOW_AFTER
+    else:
+        before = after = max(0, min(int(flex_days), SEARCH_WINDOW_MAX_DAYS))
+    today = today or date.today()
+    dates = [start + timedelta(days=offset) for offset in range(-before, after + 1)]
+    return [d.strftime("%Y-%m-%d") for d in dates if d >= today] or [departure_date]
+
+
+async def gather_bounded(coros: Iterable[Awaitable[Any]], limit: int = SEARCH_MAX_CONCURRENCY) -> List[Any]:
+    """asyncio.gather with at most `limit` awaitables running at once; results keep input order."""
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(run(coro) for coro in coros))
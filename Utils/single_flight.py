@@ -0,0 +1,61 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: while a call for a key is in flight, later callers
+    await its result (or its exception) instead of starting their own.
+    The call is cancelled once every caller waiting on it has been cancelled.
+    Nothing is kept once the call finishes; caching results is the caller's job.
+    """
+
+    def __init__(self):
+        # key -> [task, number of callers waiting on it]
+        self._inflight: Dict[Hashable, List] = {}
+        self._stats = {"calls": 0, "coalesced": 0, "errors": 0, "cancelled": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() for key, or join the call already in flight for it."""
+        entry = self._inflight.get(key)
+        if entry is None:
+            self._stats["calls"] += 1
+            task = asyncio.get_running_loop().create_task(self._run(key, fn))
+            task.add_done_callback(_consume_error)
+            entry = self._inflight[key] = [task, 0]
+        else:
+            self._stats["coalesced"] += 1
+        task = entry[0]
+        entry[1] += 1
+        try:
+            # A cancelled waiter must not cancel the shared call the others are waiting on
+            return await asyncio.shield(task)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not task.done():
+                # Nobody wants the result any more: stop before it reaches upstream
+                self._stats["cancelled"] += 1
+                if self._inflight.get(key) is entry:
+                    del self._inflight[key]
+                task.cancel()
+
+    async def _run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            return await fn()
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+        finally:
+            entry = self._inflight.get(key)
+            if entry is not None and entry[0] is asyncio.current_task():
+                del self._inflight[key]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Returns leader calls, coalesced (joined) calls, errors, cancelled calls and the number in flight."""
+        return {**self._stats, "in_flight": len(self._inflight)}
+
+
+def _consume_error(task: asyncio.Task) -> None:
+    # Waiters get the exception via shield(); mark it retrieved in case all of them went away
+    if not task.cancelled():
+        task.exception()
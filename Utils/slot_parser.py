@@ -0,0 +1,252 @@
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, Optional
+from Utils.airport_index import get_airport_index
+from Utils.cabin_normalizer import exact_cabin_class
+
+MONTHS = {
+    "january": 1, "jan": 1, "february": 2, "feb": 2, "march": 3, "mar": 3, "april": 4, "apr": 4,
+    "may": 5, "june": 6, "jun": 6, "july": 7, "jul": 7, "august": 8, "aug": 8,
+    "september": 9, "sept": 9, "sep": 9, "october": 10, "oct": 10, "november": 11, "nov": 11,
+    "december": 12, "dec": 12,
+}
+WEEKDAYS = {"monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3, "friday": 4, "saturday": 5, "sunday": 6}
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fourteen": 14,
+}
+# Display form stored in state, matching what the extraction LLM returns
+CABIN_LABELS = {"ECONOMY": "economy", "PREMIUM_ECONOMY": "premium economy", "BUSINESS": "business", "FIRST": "first class"}
+
+# Words that can surround slot values without changing their meaning
+FILLER_WORDS = {
+    "i", "im", "i'm", "we", "want", "wanna", "would", "like", "to", "fly", "flying", "go", "going", "travel",
+    "traveling", "travelling", "leave", "leaving", "depart", "departing", "on", "for", "the", "please",
+    "and", "a", "trip", "stay", "staying", "class", "cabin", "in", "it", "its", "it's", "be", "will",
+    "ok", "okay", "yes", "sure", "of", "from", "at", "around", "about",
+}
+
+_MONTH_PATTERN = "|".join(sorted(MONTHS, key=len, reverse=True))
+_NUMBER_PATTERN = r"\d{1,3}|" + "|".join(sorted(NUMBER_WORDS, key=len, reverse=True))
+
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_MONTH_DAY = re.compile(rf"\b({_MONTH_PATTERN})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(\d{{4}}))?\b")
+_DAY_MONTH = re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({_MONTH_PATTERN})\.?(?:,?\s+(\d{{4}}))?\b")
+_DAY_ONLY = re.compile(r"\bthe\s+(\d{1,2})(?:st|nd|rd|th)\b")
+_RELATIVE_DAY = re.compile(r"\b(today|tomorrow|day after tomorrow)\b")
+_IN_DAYS = re.compile(rf"\bin\s+({_NUMBER_PATTERN})\s+days?\b")
+_WEEKDAY = re.compile(r"\b(?:(next|this)\s+)?(" + "|".join(WEEKDAYS) + r")\b")
+_DURATION = re.compile(rf"\b({_NUMBER_PATTERN})\s*(days?|nights?|weeks?)\b")
+_FROM_TO = re.compile(r"^(?:from\s+)?(.+?)\s+(?:to|->|-)\s+(.+)$")
+_FROM = re.compile(r"^from\s+(.+)$")
+_TO = re.compile(r"^to\s+(.+)$")
+
+# Words that split a message into an origin and a destination
+PLACE_SEPARATORS = {"to", "from", "-", "->"}
+
+# Which location the assistant's last question asked for ("Which city are you flying from?")
+_ASKS_ORIGIN = re.compile(r"\b(?:from|origin|leaving|departure (?:city|airport))\b")
+_ASKS_DESTINATION = re.compile(
+    r"\b(?:(?:fly|flying|go|going|travel|travelling|traveling|head|heading)\s+to|destination|visit)\b"
+    r"|\bwhere\b.*\b(?:go|going|to)\b"
+)
+
+_stats = {"hits": 0, "misses": 0}
+
+
+def _number(token: str) -> int:
+    return int(token) if token.isdigit() else NUMBER_WORDS[token]
+
+
+def _resolve_year(month: int, day: int, today: date) -> Optional[date]:
+    """Year omitted: this year, unless the month is already past, then next year."""
+    year = today.year + 1 if month < today.month else today.year
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _resolve_month(day: int, today: date) -> Optional[date]:
+    """Month and year omitted: this month, unless the day is already past, then next month."""
+    year, month = today.year, today.month
+    if day < today.day:
+        month += 1
+        if month > 12:
+            month, year = 1, year + 1
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _consume(pattern: re.Pattern, text: str):
+    match = pattern.search(text)
+    if not match:
+        return None, text
+    return match, text[:match.start()] + " " + text[match.end():]
+
+
+def _parse_date(text: str, today: date):
+    """Find one departure date in text; returns (date or None, text with the date removed)."""
+    match, rest = _consume(_ISO_DATE, text)
+    if match:
+        try:
+            return date(int(match.group(1)), int(match.group(2)), int(match.group(3))), rest
+        except ValueError:
+            return None, text
+
+    for pattern, month_group, day_group in ((_MONTH_DAY, 1, 2), (_DAY_MONTH, 2, 1)):
+        match, rest = _consume(pattern, text)
+        if match:
+            month, day = MONTHS[match.group(month_group)], int(match.group(day_group))
+            if match.group(3):
+                try:
+                    return date(int(match.group(3)), month, day), rest
+                except ValueError:
+                    return None, text
+            return _resolve_year(month, day, today), rest
+
+    match, rest = _consume(_DAY_ONLY, text)
+    if match:
+        return _resolve_month(int(match.group(1)), today), rest
+
+    match, rest = _consume(_RELATIVE_DAY, text)
+    if match:
+        offset = {"today": 0, "tomorrow": 1, "day after tomorrow": 2}[match.group(1)]
+        return today + timedelta(days=offset), rest
+
+    match, rest = _consume(_IN_DAYS, text)
+    if match:
+        return today + timedelta(days=_number(match.group(1))), rest
+
+    match, rest = _consume(_WEEKDAY, text)
+    if match:
+        # "friday", "this friday" and "next friday" all mean the coming one
+        ahead = (WEEKDAYS[match.group(2)] - today.weekday()) % 7 or 7
+        return today + timedelta(days=ahead), rest
+
+    return None, text
+
+
+def _place(text: str) -> Optional[str]:
+    """Return the place as typed if the offline airport index knows it exactly, else None."""
+    words = [w for w in text.split() if w not in {"to", "from", "the", "please", "fly", "flying"}]
+    if not words or any(w in PLACE_SEPARATORS for w in words):
+        return None
+    candidate = " ".join(words).strip(" ,.")
+    airport_index = get_airport_index()
+    if not airport_index.lookup_exact(candidate):
+        return None
+    # "cairo dubai": two places side by side is not one place
+    for split in range(1, len(words)):
+        if airport_index.lookup_exact(" ".join(words[:split])) and airport_index.lookup_exact(" ".join(words[split:])):
+            return None
+    return candidate.upper() if len(candidate) == 3 and airport_index.is_airport_code(candidate) else candidate.title()
+
+
+def parse_slots(message: str, state: Dict[str, Any], today: Optional[date] = None) -> Optional[Dict[str, Any]]:
+    """
+    Deterministically parse a user message into booking slots.
+    Returns the slots only when every meaningful word was understood; returns None when the
+    message is ambiguous or has leftovers, so the caller falls back to the LLM.
+    """
+    today = today or date.today()
+    text = " " + re.sub(r"[!?;]+", " ", message.lower()).replace(",", " , ") + " "
+    slots: Dict[str, Any] = {}
+
+    departure, text = _parse_date(text, today)
+    if departure:
+        slots["departure_date"] = departure.strftime("%Y-%m-%d")
+    elif _ISO_DATE.search(text):
+        return _miss()
+
+    match, text = _consume(_DURATION, text)
+    if match:
+        days = _number(match.group(1))
+        slots["duration"] = days * 7 if match.group(2).startswith("week") else days
+
+    # Cabin: try the longest word windows first so "premium economy" beats "economy"
+    words = text.split()
+    for size in (3, 2, 1):
+        for start in range(len(words) - size + 1):
+            phrase = " ".join(words[start:start + size])
+            code = exact_cabin_class(phrase)
+            if code and len(phrase) > 1:
+                slots["cabin_class"] = CABIN_LABELS[code]
+                del words[start:start + size]
+                break
+        if "cabin_class" in slots:
+            break
+    text = " ".join(w for w in words if w != ",")
+
+    rest = text.strip(" .")
+    if rest:
+        # "Dubai for 5 days" names where to stay, not where from: leave a bare place to the LLM
+        places = _parse_places(rest, state, bare_place_ok="duration" not in slots)
+        if places is None:
+            return _miss()
+        slots.update(places)
+
+    if not slots:
+        return _miss()
+    _stats["hits"] += 1
+    return slots
+
+
+def _parse_places(text: str, state: Dict[str, Any], bare_place_ok: bool = True) -> Optional[Dict[str, Any]]:
+    raw_words = text.split()
+    words = [w for w in raw_words if w not in FILLER_WORDS or w in PLACE_SEPARATORS]
+    if not [w for w in words if w not in PLACE_SEPARATORS]:
+        return {}
+    # "want to go to dubai" -> "to to dubai" -> "to dubai"
+    compact = re.sub(r"\b(to|from)(\s+\1\b)+", r"\1", " ".join(words))
+
+    if any(w in PLACE_SEPARATORS for w in words):
+        match = _FROM_TO.match(compact)
+        if match:
+            origin, destination = _place(match.group(1)), _place(match.group(2))
+            if origin and destination:
+                return {"origin": origin, "destination": destination}
+        match = _FROM.match(compact)
+        if match and _place(match.group(1)):
+            return {"origin": _place(match.group(1))}
+        match = _TO.match(compact)
+        if match and _place(match.group(1)):
+            return {"destination": _place(match.group(1))}
+        return None
+
+    # "a week in Paris" could be either end of the trip
+    if not bare_place_ok or "in" in raw_words:
+        return None
+
+    # A bare place ("Cairo", "CAI") answers the location the assistant just asked for
+    slot = _asked_location(state)
+    place = _place(compact)
+    if not slot or not place:
+        return None
+    return {slot: place}
+
+
+def _asked_location(state: Dict[str, Any]) -> Optional[str]:
+    """"origin" or "destination" if the last assistant message asked for exactly that one, else None."""
+    question = next(
+        (m.get("content") or "" for m in reversed(state.get("conversation") or []) if m.get("role") == "assistant"),
+        "",
+    ).lower()
+    asks_origin = bool(_ASKS_ORIGIN.search(question))
+    asks_destination = bool(_ASKS_DESTINATION.search(question))
+    if asks_origin == asks_destination:
+        return None
+    return "origin" if asks_origin else "destination"
+
+
+def _miss() -> None:
+    _stats["misses"] += 1
+    return None
+
+
+def get_fast_path_stats() -> Dict[str, Any]:
+    """Hit/miss counters for the rule-based fast path."""
+    total = _stats["hits"] + _stats["misses"]
+    return {**_stats, "hit_rate": round(_stats["hits"] / total, 3) if total else 0.0}
@@ -30,8 +30,7 @@ def initialize_state_from_thread(
 
         # Hotels
         "city_code": None,
-        "checkin_date": None,
-        "checkout_date": None,
+        "stay_windows": None,
 
         # Results
         "formatted_results": None,
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Dict, Optional, Set
+
+SUMMARY_STORE_MAX_THREADS = int(os.getenv("SUMMARY_STORE_MAX_THREADS", "1000"))
+
+
+class SummaryStore:
+    """Latest package summary per thread, filled in by background tasks and awaited by long-polling readers."""
+
+    def __init__(self, max_threads: int = SUMMARY_STORE_MAX_THREADS):
+        self.max_threads = max_threads
+        # thread_id -> {"status", "summary", "updated_at", "event"}; least recently written first
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def begin(self, thread_id: str) -> Dict[str, Any]:
+        """Mark the thread's summary as pending, replacing (and cancelling) any earlier one."""
+        self.clear(thread_id)
+        entry = {"status": "pending", "summary": None, "updated_at": time.time(), "event": asyncio.Event(), "task": None}
+        self._entries[thread_id] = entry
+        while len(self._entries) > self.max_threads:
+            self._entries.popitem(last=False)
+        return entry
+
+    def start(self, thread_id: str, summary: Awaitable[str]) -> None:
+        """Mark the thread's summary as pending and compute it in a background task."""
+        entry = self.begin(thread_id)
+
+        async def run():
+            try:
+                self.set(thread_id, await summary, entry)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"SummaryStore: summary for {thread_id} failed: {e}")
+                self.fail(entry)
+
+        task = asyncio.get_running_loop().create_task(run())
+        entry["task"] = task
+        # Keep a strong reference until the task finishes
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        if asyncio.iscoroutine(summary):
+            # Cancelled before it started: close the coroutine so it isn't reported as never awaited
+            task.add_done_callback(lambda _: summary.close())
+
+    def set(self, thread_id: str, summary: str, entry: Optional[Dict[str, Any]] = None) -> None:
+        """Store a finished summary (ignored if a newer search replaced the pending entry)."""
+        current = self._entries.get(thread_id)
+        if entry is not None and current is not entry:
+            return
+        if current is None:
+            current = {"event": asyncio.Event()}
+            self._entries[thread_id] = current
+        current.update({"status": "ready", "summary": summary, "updated_at": time.time(), "task": None})
+        current["event"].set()
+
+    def fail(self, entry: Dict[str, Any]) -> None:
+        """Mark a pending entry as failed and release its waiters."""
+        if entry["status"] == "pending":
+            entry.update({"status": "failed", "updated_at": time.time(), "task": None})
+            entry["event"].set()
+
+    async def get(self, thread_id: str, wait: float = 0) -> Optional[Dict[str, Any]]:
+        """Return {"status", "summary"} for a thread, waiting up to `wait` seconds for a pending one."""
+        entry = self._entries.get(thread_id)
+        if entry is None:
+            return None
+        if entry["status"] == "pending" and wait > 0:
+            try:
+                await asyncio.wait_for(entry["event"].wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+        return {"status": entry["status"], "summary": entry["summary"]}
+
+    def clear(self, thread_id: str) -> None:
+        entry = self._entries.pop(thread_id, None)
+        if entry and entry.get("task"):
+            entry["task"].cancel()
+
+
+# Global summary store instance
+package_summaries = SummaryStore()
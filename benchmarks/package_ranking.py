@@ -0,0 +1,47 @@
+"""
+Time rank_packages on a wide search: hundreds of flights and thousands of hotels per date.
+
+    python -m benchmarks.package_ranking
+"""
+import random
+import time
+
+from benchmarks.sample_data import make_flight_offer, make_hotel_offers
+from Nodes.get_hotel_offers_node import process_hotel_offers
+from Utils.package_ranking import rank_packages
+
+DATES = 7
+FLIGHTS_PER_DATE = 100
+HOTELS_PER_DATE = 2000
+ROUNDS = 20
+
+
+def build_inputs():
+    rng = random.Random(0)
+    dates = [f"2026-12-{3 + d:02d}" for d in range(DATES)]
+    flights = {
+        date: [make_flight_offer(departure=date, stops=rng.randint(0, 2), seed=d * 1000 + i) for i in range(FLIGHTS_PER_DATE)]
+        for d, date in enumerate(dates)
+    }
+    hotels = {
+        date: process_hotel_offers(make_hotel_offers(hotel_count=HOTELS_PER_DATE, offers_per_hotel=2, seed=d))
+        for d, date in enumerate(dates)
+    }
+    return dates, flights, hotels
+
+
+def main():
+    dates, flights, hotels = build_inputs()
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        ranked = rank_packages(dates, flights, hotels, k=10)
+    elapsed = (time.perf_counter() - start) / ROUNDS
+    combos = DATES * FLIGHTS_PER_DATE * HOTELS_PER_DATE
+    print(f"{combos:,} candidate packages ({DATES} dates x {FLIGHTS_PER_DATE} flights x {HOTELS_PER_DATE} hotels)")
+    print(f"rank_packages top-10: {elapsed * 1000:.2f} ms")
+    for r in ranked[:3]:
+        print(f"  {r['date']} score={r['score']['total']:.4f} {r['features']}")
+
+
+if __name__ == "__main__":
+    main()
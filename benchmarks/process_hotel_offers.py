@@ -0,0 +1,43 @@
+"""
+Micro-benchmark: columnar NumPy process_hotel_offers vs the pure-Python implementation
+on city-wide result sizes (checks both produce the same output first), for the full output
+and for the top-k cut get_hotel_offers_node asks for.
+
+    python -m benchmarks.process_hotel_offers
+"""
+import time
+
+from benchmarks.sample_data import make_hotel_offers
+from Nodes.get_hotel_offers_node import HOTEL_TOP_K, process_hotel_offers, process_hotel_offers_python
+
+SIZES = [(20, 6), (200, 10), (600, 10), (1000, 10), (2000, 20)]
+ROUNDS = 5
+
+
+def best_time(fn, data):
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    for hotel_count, offers_per_hotel in SIZES:
+        data = make_hotel_offers(hotel_count=hotel_count, offers_per_hotel=offers_per_hotel, seed=hotel_count)
+        expected = process_hotel_offers_python(data)
+        assert process_hotel_offers(data) == expected, "outputs differ"
+        assert process_hotel_offers(data, top_k=HOTEL_TOP_K) == expected[:HOTEL_TOP_K], "top-k outputs differ"
+        python_time = best_time(process_hotel_offers_python, data)
+        for label, fn in (("all", process_hotel_offers), (f"top {HOTEL_TOP_K}", lambda d: process_hotel_offers(d, top_k=HOTEL_TOP_K))):
+            numpy_time = best_time(fn, data)
+            print(
+                f"{hotel_count:>5} hotels x {offers_per_hotel:>2} offers, {label:>6}: "
+                f"python {python_time * 1000:8.2f} ms, numpy {numpy_time * 1000:8.2f} ms, "
+                f"speedup {python_time / numpy_time:.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
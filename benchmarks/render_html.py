@@ -0,0 +1,49 @@
+"""
+Compare render time and bytes per package: legacy recursive dict_to_table vs the compact card renderer.
+
+    python -m benchmarks.render_html
+"""
+import time
+
+from benchmarks.sample_data import make_flight_offer, make_hotel_offers
+from Nodes.create_packages import create_single_package
+from Nodes.get_hotel_offers_node import process_hotel_offers
+from Nodes.toHTML import dict_to_table, packages_to_html
+
+ROUNDS = 50
+
+
+def build_packages():
+    packages = []
+    for day in range(3):
+        departure = f"2026-12-0{3 + day}"
+        hotels = process_hotel_offers(make_hotel_offers(hotel_count=20, offers_per_hotel=6, seed=day))
+        packages.append(create_single_package(
+            package_id=day + 1,
+            flights=[make_flight_offer(departure=departure, seed=day)],
+            hotels=hotels,
+            checkin_date=departure,
+            checkout_date=f"2026-12-{8 + day:02d}",
+        ))
+    return packages
+
+
+def measure(label, render, packages):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        snippets = render(packages)
+    elapsed = (time.perf_counter() - start) / ROUNDS
+    size = sum(len(s.encode("utf-8")) for s in snippets)
+    print(f"{label:>8}: {elapsed * 1000 / len(packages):7.3f} ms/package, {size / len(packages):9.0f} bytes/package")
+    return elapsed, size
+
+
+def main():
+    packages = build_packages()
+    legacy_time, legacy_size = measure("legacy", lambda p: [dict_to_table(x) for x in p], packages)
+    card_time, card_size = measure("cards", lambda p: packages_to_html(p, "bench-thread"), packages)
+    print(f"speedup: {legacy_time / card_time:.1f}x, size reduction: {legacy_size / card_size:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
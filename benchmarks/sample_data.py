@@ -0,0 +1,88 @@
+"""Synthetic Amadeus-shaped payloads for the benchmarks in this folder."""
+import random
+from datetime import datetime, timedelta
+
+ROOM_TYPES = ["A1K", "B2D", "C1K", "D2T", "STD", "SUI", "DLX", "ROH"]
+
+
+def make_flight_offer(origin="CAI", destination="DXB", departure="2026-12-03", duration_days=5, stops=1, seed=0):
+    """One round-trip flight offer with realistic nesting (itineraries, segments, fare details)."""
+    rng = random.Random(seed)
+    depart_at = datetime.strptime(departure, "%Y-%m-%d") + timedelta(hours=10)
+
+    def segments(start, src, dst):
+        legs, at = [], start
+        hops = [src] + (["AUH"] * stops) + [dst]
+        for i in range(len(hops) - 1):
+            arrive = at + timedelta(hours=2, minutes=rng.randint(0, 59))
+            legs.append({
+                "departure": {"iataCode": hops[i], "terminal": "2", "at": at.isoformat()},
+                "arrival": {"iataCode": hops[i + 1], "terminal": "1", "at": arrive.isoformat()},
+                "carrierCode": "MS", "number": str(rng.randint(100, 999)),
+                "aircraft": {"code": "738"}, "operating": {"carrierCode": "MS"},
+                "duration": "PT2H30M", "id": str(rng.randint(1, 99)), "numberOfStops": 0,
+                "blacklistedInEU": False,
+            })
+            at = arrive + timedelta(hours=1)
+        return legs
+
+    price = round(rng.uniform(9000, 30000), 2)
+    return {
+        "type": "flight-offer", "id": str(seed), "source": "GDS", "instantTicketingRequired": False,
+        "nonHomogeneous": False, "oneWay": False, "lastTicketingDate": departure, "numberOfBookableSeats": 9,
+        "itineraries": [
+            {"duration": "PT6H15M", "segments": segments(depart_at, origin, destination)},
+            {"duration": "PT6H40M", "segments": segments(depart_at + timedelta(days=duration_days), destination, origin)},
+        ],
+        "price": {
+            "currency": "EGP", "total": str(price), "base": str(round(price * 0.8, 2)),
+            "fees": [{"amount": "0.00", "type": "SUPPLIER"}, {"amount": "0.00", "type": "TICKETING"}],
+            "grandTotal": str(price),
+        },
+        "pricingOptions": {"fareType": ["PUBLISHED"], "includedCheckedBagsOnly": True},
+        "validatingAirlineCodes": ["MS"],
+        "travelerPricings": [{
+            "travelerId": "1", "fareOption": "STANDARD", "travelerType": "ADULT",
+            "price": {"currency": "EGP", "total": str(price), "base": str(round(price * 0.8, 2))},
+            "fareDetailsBySegment": [
+                {"segmentId": str(i), "cabin": "ECONOMY", "fareBasis": "KLOWEG", "class": "K",
+                 "includedCheckedBags": {"quantity": 1}}
+                for i in range(2 * (stops + 1))
+            ],
+        }],
+        "_search_date": departure,
+        "_day_number": 1,
+    }
+
+
+def make_hotel_offers(hotel_count=20, offers_per_hotel=6, checkin="2026-12-03", checkout="2026-12-08", seed=0):
+    """Raw /v3/shopping/hotel-offers `data` entries."""
+    rng = random.Random(seed)
+    data = []
+    for h in range(hotel_count):
+        offers = []
+        for o in range(offers_per_hotel):
+            total = round(rng.uniform(2000, 40000), 2)
+            offers.append({
+                "id": f"OFFER{h}_{o}", "checkInDate": checkin, "checkOutDate": checkout,
+                "rateCode": "RAC", "boardType": rng.choice(["ROOM_ONLY", "BREAKFAST"]),
+                "room": {
+                    "type": rng.choice(ROOM_TYPES),
+                    "typeEstimated": {"category": "STANDARD_ROOM", "beds": 1, "bedType": "KING"},
+                    "description": {"text": "Standard room, 1 king bed, city view, free wifi, minibar.", "lang": "EN"},
+                },
+                "guests": {"adults": 1},
+                "price": {"currency": "EGP", "base": str(round(total * 0.85, 2)), "total": str(total),
+                          "variations": {"average": {"base": str(round(total / 5, 2))}}},
+                "policies": {"cancellations": [{"deadline": f"{checkin}T18:00:00+04:00"}], "paymentType": "guarantee"},
+            })
+        data.append({
+            "type": "hotel-offers",
+            "hotel": {"type": "hotel", "hotelId": f"HTL{h:05d}", "chainCode": "XX", "dupeId": str(700000 + h),
+                      "name": f"SAMPLE HOTEL {h}", "cityCode": "DXB", "latitude": 25.2, "longitude": 55.3,
+                      "rating": str(rng.randint(2, 5))},
+            "available": True,
+            "offers": offers,
+            "self": "https://test.api.amadeus.com/v3/shopping/hotel-offers?hotelIds=...",
+        })
+    return data
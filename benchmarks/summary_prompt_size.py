@@ -0,0 +1,41 @@
+"""
+Compare the summary prompt size before (json.dumps of whole packages) and after the compact projection.
+
+    python -m benchmarks.summary_prompt_size
+"""
+import json
+
+from benchmarks.sample_data import make_flight_offer, make_hotel_offers
+from Nodes.create_packages import create_single_package
+from Nodes.get_hotel_offers_node import process_hotel_offers
+from Prompts.summary_prompt import summary_prompt
+from Utils.tokens import count_tokens
+
+
+def legacy_packages_text(packages):
+    return "\n".join(f"Package{i} offers:\n{json.dumps(p, indent=2)}" for i, p in enumerate(packages, start=1))
+
+
+def main():
+    packages = []
+    for day in range(3):
+        departure = f"2026-12-0{3 + day}"
+        hotels = process_hotel_offers(make_hotel_offers(hotel_count=20, offers_per_hotel=6, seed=day))
+        packages.append(create_single_package(
+            package_id=day + 1,
+            flights=[make_flight_offer(departure=departure, seed=day)],
+            hotels=hotels,
+            checkin_date=departure,
+            checkout_date=f"2026-12-{8 + day:02d}",
+        ))
+
+    before = count_tokens(legacy_packages_text(packages))
+    after_prompt = summary_prompt(packages)
+    after = count_tokens(after_prompt)
+    print(f"legacy package data: {before} tokens")
+    print(f"compact summary prompt (whole prompt): {after} tokens")
+    print(f"reduction: {before / max(after, 1):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
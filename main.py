@@ -1,17 +1,32 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import HTMLResponse, StreamingResponse
 import os
+import json
 from dotenv import load_dotenv
 from langgraph.errors import GraphRecursionError
-from typing import List
+from typing import List, Optional
 import traceback
 import logging
 from Utils.question_to_html import question_to_html
+from Nodes.toHTML import dict_to_table, packages_to_html
 from graph import create_travel_graph
 from Models.ChatRequest import ChatRequest
 from Models.ExtractedInfo import ExtractedInfo
 from Models.FlightResult import FlightResult
 from Models.ConversationStore import conversation_store
+from Utils.http_client import close_async_client, get_upstream_stats
+from Utils.amadeus_scheduler import amadeus_scheduler, set_request_context
+from Utils.amadeus_token import amadeus_token_provider
+from Nodes.get_flight_offers_node import flight_offers_cache, flight_offers_inflight
+from Nodes.get_hotel_offers_node import hotel_offers_cache, hotel_offers_inflight
+from Utils.hotel_id_cache import hotel_id_cache
+from Utils.airport_index import get_airport_index
+from Utils.slot_parser import get_fast_path_stats
+from Utils.getLLM import get_llm_cache
+from Utils.checkpointer import create_checkpointer, close_checkpointer, delete_thread_checkpoints, forget_thread_checkpoints
+from Utils.summary_store import package_summaries
+from Nodes.summarize_packages import generate_package_summary, stream_package_summary
 
 
 logging.basicConfig(level=logging.INFO)
@@ -42,7 +57,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-graph = create_travel_graph().compile()
+# Compiled at startup, once the (possibly async) checkpointer is available
+graph = None
+
+def cache_stats():
+    """Hit/miss/eviction counters for the in-process upstream caches"""
+    return {
+        "flight_offers": flight_offers_cache.get_stats(),
+        "hotel_ids": hotel_id_cache.get_stats(),
+        "hotel_offers": hotel_offers_cache.get_stats(),
+        "airports": get_airport_index().get_stats(),
+        "llm": get_llm_cache().get_stats()
+    }
+
+def coalescing_stats():
+    """Identical in-flight upstream searches that joined an earlier caller instead of re-sending"""
+    return {
+        "flight_offers": flight_offers_inflight.get_stats(),
+        "hotel_offers": hotel_offers_inflight.get_stats()
+    }
+
+@app.on_event("startup")
+async def startup():
+    """Compile the graph with a per-thread checkpointer so search state carries across turns"""
+    global graph
+    graph = create_travel_graph().compile(checkpointer=await create_checkpointer())
+    # Checkpoints live as long as the conversation: evicted or expired threads drop their graph state
+    conversation_store.evict_hook = forget_thread_checkpoints
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Release pooled upstream connections, the token refresher and the checkpoint store"""
+    await amadeus_token_provider.close()
+    await close_async_client()
+    await close_checkpointer()
 
 @app.get("/")
 async def root():
@@ -57,103 +105,129 @@ async def health():
         return {
             "status": "warning",
             "message": f"Missing API keys: {', '.join(missing_keys)}",
-            "missing_keys": missing_keys
+            "missing_keys": missing_keys,
+            "upstream": get_upstream_stats(),
+            "amadeus_scheduler": amadeus_scheduler.get_stats(),
+            "caches": cache_stats(),
+            "coalescing": coalescing_stats(),
+            "conversations": await conversation_store.aget_stats(),
+            "fast_path": get_fast_path_stats()
         }
 
-    return {"status": "healthy", "message": "All API keys configured"}
+    return {
+        "status": "healthy",
+        "message": "All API keys configured",
+        "upstream": get_upstream_stats(),
+        "amadeus_scheduler": amadeus_scheduler.get_stats(),
+        "caches": cache_stats(),
+        "coalescing": coalescing_stats(),
+        "conversations": await conversation_store.aget_stats(),
+        "fast_path": get_fast_path_stats()
+    }
+
+async def prepare_graph_input(request: ChatRequest):
+    """Validate a chat request, record the user message and build the per-turn graph input and config."""
+    # Validate inputs
+    if not request.thread_id:
+        print("ERROR: Missing thread_id")
+        raise HTTPException(status_code=400, detail="thread_id is required")
+    
+    user_message = request.user_msg.strip()
+    if not user_message:
+        print("ERROR: Empty user message")
+        raise HTTPException(status_code=400, detail="user_msg cannot be empty")
+
+    # Validate API keys
+    missing_keys = [key for key in required_keys if not os.getenv(key)]
+    if missing_keys:
+        print(f"ERROR: Missing API keys: {missing_keys}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Missing API keys: {', '.join(missing_keys)}"
+        )
+
+    if graph is None:
+        print("ERROR: Graph was not compiled at startup")
+        raise HTTPException(status_code=500, detail="Graph compilation failed")
+
+    # ✅ Use global conversation store
+    conversation_history = await conversation_store.aget_conversation(request.thread_id)
+    print(f"✓ Got conversation history: {len(conversation_history)} messages")
+    
+    await conversation_store.aadd_message(request.thread_id, "user", user_message)
+    updated_conversation = await conversation_store.aget_conversation(request.thread_id)
+    print(f"✓ Updated conversation: {len(updated_conversation)} messages")
+
+    # Per-turn input only: extracted slots, normalized codes and search results are
+    # restored from the thread's checkpoint, so they are deliberately not reset here
+    state = {
+        "thread_id": request.thread_id,
+        "conversation": updated_conversation,
+        "current_message": user_message,
+        "needs_followup": True,
+        "info_complete": False,
+        "trip_type": "round trip",  # Always round trip
+        "followup_question": None,
+        "current_node": "llm_conversation",
+        "request_type": "flights",
+        "flex_days": request.flex_days
+    }
+    config = {"configurable": {"thread_id": request.thread_id}}
+    return state, config
+
+
+def extracted_info_from(result) -> ExtractedInfo:
+    """Build the slot summary shown next to follow-up questions"""
+    return ExtractedInfo(
+        departure_date=result.get("departure_date"),
+        origin=result.get("origin"),
+        destination=result.get("destination"),
+        cabin_class=result.get("cabin_class"),
+        trip_type=result.get("trip_type"),
+        duration=result.get("duration")
+    )
+
 
 @app.post("/api/chat")
 async def chat_endpoint(request: ChatRequest):
     """Handles the conversation for flight search using thread_id and user_msg."""
     
     try:
-        # Validate inputs
-        if not request.thread_id:
-            print("ERROR: Missing thread_id")
-            raise HTTPException(status_code=400, detail="thread_id is required")
-        
-        user_message = request.user_msg.strip()
-        if not user_message:
-            print("ERROR: Empty user message")
-            raise HTTPException(status_code=400, detail="user_msg cannot be empty")
-
-        # Validate API keys
-        missing_keys = [key for key in required_keys if not os.getenv(key)]
-        if missing_keys:
-            print(f"ERROR: Missing API keys: {missing_keys}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Missing API keys: {', '.join(missing_keys)}"
-            )
-
-        # ✅ Use global conversation store
-        conversation_history = conversation_store.get_conversation(request.thread_id)
-        print(f"✓ Got conversation history: {len(conversation_history)} messages")
-        
-        conversation_store.add_message(request.thread_id, "user", user_message)
-        updated_conversation = conversation_store.get_conversation(request.thread_id)
-        print(f"✓ Updated conversation: {len(updated_conversation)} messages")
-
-        # Initialize state for LangGraph
-        state = {
-            "thread_id": request.thread_id,
-            "conversation": updated_conversation,
-            "current_message": user_message,
-            "needs_followup": True,
-            "info_complete": False,
-            "trip_type": "round trip",  # Always round trip
-            "node_trace": [],
-            "departure_date": None,
-            "origin": None,
-            "destination": None,
-            "cabin_class": None,
-            "duration": None,
-            "followup_question": None,
-            "current_node": "llm_conversation",
-            "followup_count": 0,
-            "request_type": "flights"
-        }
-
-        if graph is None:
-            print("ERROR: Graph was not compiled at startup")
-            raise HTTPException(status_code=500, detail="Graph compilation failed")
+        state, config = await prepare_graph_input(request)
+        # Amadeus calls made by this search queue fairly against other threads' searches
+        set_request_context(request.thread_id)
 
-        # Run LangGraph workflow
-        result = graph.invoke(state)
+        # Run LangGraph workflow (async nodes, never blocks the event loop)
+        result = await graph.ainvoke(state, config)
         
         print("✓ LangGraph execution completed")
         try:
             print("Result keys:", list(result.keys()))
+            if result.get("prompt_tokens") is not None:
+                print(f"✓ extraction prompt_tokens: {result.get('prompt_tokens')}")
             if result.get("travel_packages"):
                 print(f"✓ travel_packages present: {len(result.get('travel_packages', []))}")
             if result.get("travel_packages_html"):
                 print(f"✓ travel_packages_html present: {len(result.get('travel_packages_html', []))}")
-            if result.get("package_summary"):
-                print("✓ package_summary present")
         except Exception as _:
             print("(debug) unable to print result keys")
 
         # Build extracted info for response
-        extracted_info = ExtractedInfo(
-            departure_date=result.get("departure_date"),
-            origin=result.get("origin"),
-            destination=result.get("destination"),
-            cabin_class=result.get("cabin_class"),
-            trip_type=result.get("trip_type"),
-            duration=result.get("duration")
-        )
+        extracted_info = extracted_info_from(result)
 
         # If still collecting information, return follow-up question
         if result.get("needs_followup", True):
             assistant_message = result.get("followup_question", "Could you provide more details about your flight?")
             
-            conversation_store.add_message(request.thread_id, "assistant", assistant_message)
+            await conversation_store.aadd_message(request.thread_id, "assistant", assistant_message)
             html_content = question_to_html(assistant_message, extracted_info)
             return html_content
 
         # If we have travel packages HTML, return it so the user can see packages
         if result.get("travel_packages_html"):
             print(f"✓ Returning {len(result['travel_packages_html'])} travel packages (HTML)")
+            # The LLM summary is slow; fetch it later from /api/summary/{thread_id}
+            package_summaries.start(request.thread_id, generate_package_summary(result.get("travel_packages", [])))
             return result["travel_packages_html"]
 
         # Build flight results if search completed
@@ -192,7 +266,7 @@ async def chat_endpoint(request: ChatRequest):
             print(f"returned {len(flights)} flight results")
 
         assistant_message = result.get("summary", "Here are your flight options:")
-        conversation_store.add_message(request.thread_id, "assistant", assistant_message)
+        await conversation_store.aadd_message(request.thread_id, "assistant", assistant_message)
         
         return flights
 
@@ -207,20 +281,105 @@ async def chat_endpoint(request: ChatRequest):
             status_code=500,
             detail="Internal server error while processing request"
         )
+
+def sse_event(event: str, data) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/api/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Streaming variant of /api/chat (Server-Sent Events).
+    Emits a `node` event as each graph node completes, `packages` with the package HTML as soon as
+    packages are built, then `summary_token` events while the summary is generated after the graph
+    finishes, then `followup` or `done`.
+    """
+    state, config = await prepare_graph_input(request)
+
+    async def event_stream():
+        set_request_context(request.thread_id)
+        try:
+            async for chunk in graph.astream(state, config, stream_mode="updates"):
+                for node_name, update in chunk.items():
+                    yield sse_event("node", {"node": node_name})
+                    if node_name == "create_packages" and update:
+                        yield sse_event("packages", {"html": packages_to_html(update.get("travel_packages", []), request.thread_id)})
+
+            result = (await graph.aget_state(config)).values
+            if result.get("needs_followup", True):
+                assistant_message = result.get("followup_question") or "Could you provide more details about your flight?"
+                await conversation_store.aadd_message(request.thread_id, "assistant", assistant_message)
+                yield sse_event("followup", {"html": question_to_html(assistant_message, extracted_info_from(result))})
+                yield sse_event("done", {"summary": None})
+                return
+
+            summary = None
+            if result.get("travel_packages_html"):
+                entry = package_summaries.begin(request.thread_id)
+                parts = []
+                try:
+                    async for text in stream_package_summary(result.get("travel_packages", [])):
+                        parts.append(text)
+                        yield sse_event("summary_token", {"text": text})
+                    summary = "".join(parts)
+                    package_summaries.set(request.thread_id, summary, entry)
+                finally:
+                    # Client went away mid-stream: don't leave long-pollers waiting on it
+                    package_summaries.fail(entry)
+            yield sse_event("done", {"summary": summary})
+        except Exception as e:
+            print(f"UNEXPECTED ERROR while streaming: {e}")
+            traceback.print_exc()
+            yield sse_event("error", {"detail": "Internal server error while processing request"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Keep your other endpoints...
 @app.post("/api/reset/{thread_id}")
 async def reset_conversation(thread_id: str):
     """Reset conversation history for a specific thread"""
     print(f"Resetting conversation for thread: {thread_id}")
-    conversation_store.clear_conversation(thread_id)
+    await conversation_store.aclear_conversation(thread_id)
+    await delete_thread_checkpoints(thread_id)
+    package_summaries.clear(thread_id)
     return {"message": f"Conversation for thread {thread_id} has been reset"}
 
+@app.get("/api/summary/{thread_id}")
+async def get_package_summary(thread_id: str, wait: float = Query(0, ge=0, le=30)):
+    """
+    Get the LLM summary of the thread's latest travel packages.
+    While it is still being generated, waits up to `wait` seconds (long-poll) before answering with status "pending".
+    """
+    entry = await package_summaries.get(thread_id, wait=wait)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"No package summary for thread {thread_id}")
+    return {"thread_id": thread_id, **entry}
+
+@app.get("/api/packages/{thread_id}/{package_id}")
+async def get_package_details(thread_id: str, package_id: int, format: str = Query("json", pattern="^(json|html)$")):
+    """Full package details (raw flight offer and hotel offers) from the thread's latest search, fetched on demand"""
+    if graph is None:
+        raise HTTPException(status_code=500, detail="Graph compilation failed")
+    snapshot = await graph.aget_state({"configurable": {"thread_id": thread_id}})
+    packages = (snapshot.values or {}).get("travel_packages") or []
+    package = next((p for p in packages if isinstance(p, dict) and p.get("package_id") == package_id), None)
+    if package is None:
+        raise HTTPException(status_code=404, detail=f"Package {package_id} not found for thread {thread_id}")
+    if format == "html":
+        return HTMLResponse(dict_to_table(package))
+    return package
+
 @app.get("/api/threads")
-async def get_active_threads():
-    """Get all active conversation threads"""
-    threads = conversation_store.get_all_threads()
-    print(f"Getting active threads: {len(threads)} found")
-    return {"threads": threads, "count": len(threads)}
+async def get_active_threads(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000)):
+    """Get active conversation threads, one page at a time (pass next_cursor back as cursor)"""
+    threads, next_cursor = await conversation_store.alist_threads(cursor=cursor, limit=limit)
+    print(f"Getting active threads: {len(threads)} returned")
+    return {"threads": threads, "count": len(threads), "next_cursor": next_cursor}
 
 
 # if __name__ == "__main__":
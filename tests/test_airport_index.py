@@ -0,0 +1,29 @@
+import pytest
+
+from Utils.airport_index import get_airport_index
+
+
+@pytest.mark.parametrize("location, code", [
+    ("Cairo", "CAI"),
+    ("dxb", "DXB"),
+    ("Paris, France", "CDG"),
+    # Typos of indexed cities
+    ("Cairoo", "CAI"),
+    ("Dubia", "DXB"),
+    ("Frankfrut", "FRA"),
+    ("Barcellona", "BCN"),
+])
+def test_resolves_known_places(location, code):
+    assert get_airport_index().resolve(location) == code
+
+
+@pytest.mark.parametrize("location", [
+    # Real cities missing from the dataset that sit one edit from a code or another city
+    "Aden",
+    "Bern",
+    "Cork",
+    "Ajman",
+    "Gaza",
+])
+def test_unknown_places_are_left_to_the_llm(location):
+    assert get_airport_index().resolve(location) is None
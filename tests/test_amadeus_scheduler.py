@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+from Utils.amadeus_scheduler import BACKGROUND, INTERACTIVE, AmadeusScheduler, set_request_context
+
+PATH = "/v3/shopping/hotel-offers"
+
+
+def _scheduler(rate=50.0, burst=1):
+    return AmadeusScheduler({"hotel_offers": (PATH, rate)}, default_rate=rate, burst=burst)
+
+
+async def _drain(scheduler):
+    # Spend the burst so later callers have to queue
+    for _ in range(scheduler.queues["hotel_offers"].burst):
+        await scheduler.acquire(PATH)
+
+
+def _run_queued(scheduler, callers):
+    """Queue (owner, priority) callers behind an empty bucket; returns the order they were admitted in."""
+    admitted = []
+
+    async def call(owner, priority):
+        set_request_context(owner, priority)
+        await scheduler.acquire(PATH)
+        admitted.append(owner)
+
+    async def run():
+        await _drain(scheduler)
+        tasks = []
+        for owner, priority in callers:
+            tasks.append(asyncio.ensure_future(call(owner, priority)))
+            await asyncio.sleep(0)  # enqueue in this order
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    return admitted
+
+
+def test_endpoint_routing():
+    scheduler = _scheduler()
+    assert scheduler.endpoint_for(PATH + "?hotelIds=X") == "hotel_offers"
+    assert scheduler.endpoint_for("/v1/security/oauth2/token") == "other"
+
+
+def test_interactive_goes_before_queued_background():
+    admitted = _run_queued(_scheduler(), [("refresh", BACKGROUND), ("user", INTERACTIVE)])
+    assert admitted == ["user", "refresh"]
+
+
+def test_owners_alternate():
+    callers = [("a", INTERACTIVE)] * 3 + [("b", INTERACTIVE)] * 3
+    assert _run_queued(_scheduler(), callers) == ["a", "b", "a", "b", "a", "b"]
+
+
+def test_bucket_limits_rate_after_burst():
+    scheduler = _scheduler(rate=20.0, burst=2)
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*(scheduler.acquire(PATH) for _ in range(6)))
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(run())
+    # 2 from the burst, then 4 more at 20/s
+    assert elapsed >= 0.15
+    assert scheduler.get_stats()["hotel_offers"]["dispatched"] == 6
+
+
+def test_cancelled_waiter_does_not_take_a_token():
+    scheduler = _scheduler()
+
+    async def run():
+        await _drain(scheduler)
+        cancelled = asyncio.ensure_future(scheduler.acquire(PATH))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        await scheduler.acquire(PATH)
+        return cancelled
+
+    cancelled = asyncio.run(run())
+    stats = scheduler.get_stats()["hotel_offers"]
+    assert cancelled.cancelled()
+    assert stats["dispatched"] == 2
+    assert stats["queue_depth"] == 0
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+import Utils.hotel_id_cache as hotel_id_cache_module
+from Utils.amadeus_scheduler import BACKGROUND, INTERACTIVE, _request_priority
+from Utils.hotel_id_cache import HotelIdCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(hotel_id_cache_module.time, "time", lambda: now[0])
+    return now
+
+
+class Fetcher:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.priorities = []
+
+    async def __call__(self):
+        self.priorities.append(_request_priority.get())
+        await asyncio.sleep(0.01)
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_fresh_entry_is_served_without_fetching(clock):
+    cache = HotelIdCache(ttl=100, max_stale=1000)
+    fetch = Fetcher(["H1"], ["H2"])
+
+    async def run():
+        return await cache.get_or_fetch("par", fetch), await cache.get_or_fetch("PAR", fetch)
+
+    assert asyncio.run(run()) == (["H1"], ["H1"])
+    assert len(fetch.priorities) == 1
+
+
+def test_stale_entry_is_served_while_revalidating_in_background(clock):
+    cache = HotelIdCache(ttl=100, max_stale=1000)
+    fetch = Fetcher(["H1"], ["H2"])
+
+    async def run():
+        await cache.get_or_fetch("PAR", fetch)
+        clock[0] += 500
+        stale = await cache.get_or_fetch("PAR", fetch)
+        await asyncio.sleep(0.05)
+        return stale, await cache.get_or_fetch("PAR", fetch)
+
+    assert asyncio.run(run()) == (["H1"], ["H2"])
+    assert fetch.priorities == [INTERACTIVE, BACKGROUND]
+    assert cache.get_stats()["stale_hits"] == 1
+
+
+def test_too_stale_entry_waits_for_a_fetch(clock):
+    cache = HotelIdCache(ttl=100, max_stale=1000)
+    fetch = Fetcher(["H1"], ["H2"])
+
+    async def run():
+        await cache.get_or_fetch("PAR", fetch)
+        clock[0] += 2000
+        return await cache.get_or_fetch("PAR", fetch)
+
+    assert asyncio.run(run()) == ["H2"]
+    assert cache.get_stats()["misses"] == 2
+
+
+def test_concurrent_misses_share_one_fetch(clock):
+    cache = HotelIdCache(ttl=100, max_stale=1000)
+    fetch = Fetcher(["H1"])
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_fetch("PAR", fetch) for _ in range(3)))
+
+    assert asyncio.run(run()) == [["H1"]] * 3
+    assert len(fetch.priorities) == 1
+
+
+def test_failed_revalidation_keeps_the_stale_entry(clock):
+    cache = HotelIdCache(ttl=100, max_stale=1000)
+    fetch = Fetcher(["H1"], RuntimeError("upstream down"), ["H3"])
+
+    async def run():
+        await cache.get_or_fetch("PAR", fetch)
+        clock[0] += 500
+        await cache.get_or_fetch("PAR", fetch)
+        await asyncio.sleep(0.05)
+        return await cache.get_or_fetch("PAR", fetch)
+
+    assert asyncio.run(run()) == ["H1"]
+    assert cache.get_stats()["refresh_errors"] == 1
+
+
+def test_entries_persist_across_instances(clock, tmp_path):
+    path = str(tmp_path / "hotel_ids.sqlite3")
+    asyncio.run(HotelIdCache(ttl=100, max_stale=1000, path=path).get_or_fetch("PAR", Fetcher(["H1", "H2"])))
+
+    fetch = Fetcher(["other"])
+    assert asyncio.run(HotelIdCache(ttl=100, max_stale=1000, path=path).get_or_fetch("PAR", fetch)) == ["H1", "H2"]
+    assert fetch.priorities == []
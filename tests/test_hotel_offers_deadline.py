@@ -0,0 +1,40 @@
+import asyncio
+
+import Nodes.get_hotel_offers_node as hotel_node
+
+
+class _Response:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"data": []}
+
+
+def test_no_upstream_call_starts_after_deadline(monkeypatch):
+    started = []
+
+    async def fake_request(method, path, params=None, **kwargs):
+        started.append(params["hotelIds"])
+        await asyncio.sleep(0.1)
+        return _Response()
+
+    monkeypatch.setattr(hotel_node, "amadeus_request", fake_request)
+    monkeypatch.setattr(hotel_node, "HOTEL_SEARCH_DEADLINE", 0.3)
+    hotel_node.hotel_offers_cache.clear()
+
+    state = {
+        "hotel_id": [f"H{i:04d}" for i in range(400)],
+        "stay_windows": {"2026-12-03": {"checkin": "2026-12-03", "checkout": "2026-12-08"}},
+    }
+
+    async def run():
+        await hotel_node.get_hotel_offers_node(state)
+        at_deadline = len(started)
+        await asyncio.sleep(0.5)
+        return at_deadline
+
+    at_deadline = asyncio.run(run())
+    assert 0 < at_deadline < 20
+    assert len(started) == at_deadline
+    assert hotel_node.hotel_offers_inflight.get_stats()["in_flight"] == 0
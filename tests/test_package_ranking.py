@@ -0,0 +1,86 @@
+import itertools
+import random
+
+import pytest
+
+import Utils.package_ranking as ranking
+from benchmarks.sample_data import make_flight_offer, make_hotel_offers
+from Nodes.get_hotel_offers_node import process_hotel_offers
+from Utils.package_ranking import flight_features, hotel_features, rank_packages
+
+DATES = ["2026-12-03", "2026-12-04", "2026-12-05"]
+
+
+def _inputs(seed, flights_per_date=6, hotels_per_date=8):
+    rng = random.Random(seed)
+    flights, hotels = {}, {}
+    for d, date in enumerate(DATES):
+        flights[date] = []
+        for i in range(flights_per_date):
+            flight = make_flight_offer(departure=date, stops=rng.randint(0, 2), seed=seed * 100 + d * 10 + i)
+            flight["id"] = f"{date}/F{i}"
+            flight["itineraries"][0]["duration"] = f"PT{rng.randint(3, 12)}H{rng.randint(0, 59)}M"
+            flights[date].append(flight)
+        hotels[date] = process_hotel_offers(make_hotel_offers(hotel_count=hotels_per_date, offers_per_hotel=3, seed=seed * 100 + d))
+    return flights, hotels
+
+
+def _brute_force(flights_by_date, hotels_by_date, k, max_per_flight):
+    """Score every (date, flight, hotel) and take the best k, at most max_per_flight per flight."""
+    pairs = [
+        (date, flight_features(f), f, hotel_features(h), h)
+        for date in DATES
+        for f, h in itertools.product(flights_by_date[date], hotels_by_date[date])
+        if hotel_features(h) is not None
+    ]
+    ref_price = min(
+        min(flight_features(f)["price"] for f in flights_by_date[date])
+        + min(hotel_features(h)["price"] for h in hotels_by_date[date] if hotel_features(h))
+        for date in DATES
+    )
+    ref_hours = min(flight_features(f)["hours"] for date in DATES for f in flights_by_date[date])
+
+    def score(ff, hf):
+        return (ranking.RANK_WEIGHT_PRICE * (ff["price"] + hf["price"]) / ref_price
+                + ranking.RANK_WEIGHT_STOPS * ff["stops"]
+                + ranking.RANK_WEIGHT_DURATION * (ff["hours"] / ref_hours - 1)
+                + ranking.RANK_WEIGHT_RATING * (5 - min(hf["rating"], 5)) / 5)
+
+    used, best = {}, []
+    for date, ff, f, hf, h in sorted(pairs, key=lambda p: score(p[1], p[3])):
+        if used.get(f["id"], 0) < max_per_flight:
+            used[f["id"]] = used.get(f["id"], 0) + 1
+            best.append((f["id"], h["hotel"]["hotelId"]))
+        if len(best) == k:
+            break
+    return best
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("k, max_per_flight", [(1, 1), (3, 1), (5, 2), (10, 3)])
+def test_matches_brute_force(seed, k, max_per_flight):
+    flights, hotels = _inputs(seed)
+    ranked = rank_packages(DATES, flights, hotels, k=k, max_per_flight=max_per_flight)
+    assert [(p["flight"]["id"], p["hotel"]["hotel"]["hotelId"]) for p in ranked] == _brute_force(flights, hotels, k, max_per_flight)
+    assert [p["score"]["total"] for p in ranked] == sorted(p["score"]["total"] for p in ranked)
+
+
+def test_hotel_scan_pruning_matches_full_scan():
+    _, hotels = _inputs(7, hotels_per_date=200)
+    cheapest_first = hotels[DATES[0]]
+    shuffled = cheapest_first[:]
+    random.Random(0).shuffle(shuffled)  # out of order: scanned in full
+
+    def score(h):
+        return h["price"] / 10000 + 0.2 * (5 - h["rating"]) / 5
+
+    pruned = ranking._best_hotels(cheapest_first, 5, score, 1 / 10000)
+    full = ranking._best_hotels(shuffled, 5, score, 1 / 10000)
+    assert [(s, info["hotel"]["hotelId"]) for s, _, _, info in pruned] == [(s, info["hotel"]["hotelId"]) for s, _, _, info in full]
+
+
+def test_dates_without_hotels_are_skipped_when_others_have_them():
+    flights, hotels = _inputs(1)
+    hotels[DATES[0]] = []
+    ranked = rank_packages(DATES, flights, hotels, k=5)
+    assert ranked and all(p["date"] != DATES[0] for p in ranked)
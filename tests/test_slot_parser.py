@@ -0,0 +1,49 @@
+from datetime import date
+
+import pytest
+
+from Utils.slot_parser import parse_slots
+
+TODAY = date(2026, 10, 18)
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("cairo to dubai", {"origin": "Cairo", "destination": "Dubai"}),
+    ("cairo - dubai", {"origin": "Cairo", "destination": "Dubai"}),
+    ("CAI -> DXB", {"origin": "CAI", "destination": "DXB"}),
+    ("from cairo", {"origin": "Cairo"}),
+])
+def test_places_fill_slots(message, expected):
+    assert parse_slots(message, {}, TODAY) == expected
+
+
+def _after(question):
+    return {"conversation": [{"role": "assistant", "content": question}, {"role": "user", "content": "..."}]}
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("Which city are you flying from?", {"origin": "Dubai"}),
+    ("Where would you like to go?", {"destination": "Dubai"}),
+    ("Which city would you like to fly to?", {"destination": "Dubai"}),
+])
+def test_bare_place_answers_the_question_asked(question, expected):
+    assert parse_slots("dubai", _after(question), TODAY) == expected
+
+
+@pytest.mark.parametrize("state", [
+    {},
+    _after("What is your departure date? (YYYY-MM-DD)"),
+    _after("Where are you departing from and where to?"),
+])
+def test_bare_place_without_a_clear_question_falls_through(state):
+    assert parse_slots("dubai", state, TODAY) is None
+
+
+@pytest.mark.parametrize("message", [
+    # Could be either end of the trip; the LLM decides
+    "I want a week in Paris",
+    "Dubai for 5 days",
+    "cairo dubai",
+])
+def test_ambiguous_places_fall_through(message):
+    assert parse_slots(message, {}, TODAY) is None
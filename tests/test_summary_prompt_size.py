@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from benchmarks.sample_data import make_flight_offer, make_hotel_offers
+from Nodes.create_packages import create_single_package
+from Nodes.get_hotel_offers_node import process_hotel_offers
+from Prompts.summary_prompt import SUMMARY_PACKAGES_TOKEN_BUDGET, render_packages_within_budget
+from Utils.tokens import count_tokens
+
+
+def _sample_packages(count):
+    packages = []
+    for day in range(count):
+        departure = f"2026-12-{3 + day:02d}"
+        hotels = process_hotel_offers(make_hotel_offers(hotel_count=20, offers_per_hotel=6, seed=day))
+        packages.append(create_single_package(
+            package_id=day + 1,
+            flights=[make_flight_offer(departure=departure, seed=day)],
+            hotels=hotels,
+            checkin_date=departure,
+            checkout_date=f"2026-12-{8 + day:02d}",
+        ))
+    return packages
+
+
+def _legacy_tokens(packages):
+    # What the summary prompt used to embed: every package dumped whole
+    return count_tokens("\n".join(f"Package{i} offers:\n{json.dumps(p, indent=2)}" for i, p in enumerate(packages, start=1)))
+
+
+@pytest.mark.parametrize("count", [1, 3, 10])
+def test_packages_render_within_budget(count):
+    packages = _sample_packages(count)
+    rendered = render_packages_within_budget(packages)
+    assert count_tokens(rendered) <= SUMMARY_PACKAGES_TOKEN_BUDGET
+
+
+def test_rendering_is_much_smaller_than_legacy_dump():
+    packages = _sample_packages(3)
+    assert count_tokens(render_packages_within_budget(packages)) * 10 < _legacy_tokens(packages)
+
+
+def test_small_budget_is_respected():
+    packages = _sample_packages(3)
+    assert count_tokens(render_packages_within_budget(packages, budget=100)) <= 100
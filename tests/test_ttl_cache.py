@@ -0,0 +1,54 @@
+import pytest
+
+import Utils.ttl_cache as ttl_cache
+from Utils.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ttl_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(ttl_seconds=10, max_entries=10, max_bytes=10_000)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl_seconds=30)
+    clock[0] += 10
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert "a" not in cache
+    assert cache.get_stats()["expirations"] == 1
+
+
+def test_least_recently_used_is_evicted_by_count(clock):
+    cache = TTLCache(ttl_seconds=10, max_entries=2, max_bytes=10_000)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_byte_budget_evicts_and_skips_oversized(clock):
+    cache = TTLCache(ttl_seconds=10, max_entries=10, max_bytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("b", "xxxx")
+    cache.set("c", "xxxx")
+    assert "a" not in cache and "b" in cache and "c" in cache
+    assert cache.get_stats()["bytes"] == 8
+
+    cache.set("big", "x" * 11)
+    assert "big" not in cache
+    assert len(cache) == 2
+
+
+def test_replacing_a_key_keeps_byte_count(clock):
+    cache = TTLCache(ttl_seconds=10, max_entries=10, max_bytes=100, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("a", "xx")
+    assert cache.get_stats()["bytes"] == 2
+    cache.pop("a")
+    assert cache.get_stats()["bytes"] == 0